@@ -1,24 +1,67 @@
 import os
+import sys
 import json
 import re
 import traceback
 import ast
 import zipfile
 import tarfile
+import tokenize
 import tempfile
+import shutil
+import posixpath
 import requests
 import subprocess
 import shlex
-from io import BytesIO
-from flask import Flask, render_template, redirect, url_for, request, jsonify, send_file, abort, send_from_directory, session
+import select
+import atexit
+import gzip
+import hashlib
+import codecs
+import base64
+import binascii
+import fcntl
+import functools
+import operator
+import heapq
+import resource
+import signal
+import multiprocessing
+import random
+import socket
+import struct
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+import io
+from io import BytesIO, StringIO
+from flask import Flask, render_template, redirect, url_for, request, jsonify, send_file, abort, send_from_directory, session, Response, stream_with_context, g
+from flask import before_render_template, template_rendered
 from flask_cors import CORS
+from markupsafe import Markup, escape
 
 # Ajouts pour l'email de vérification
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from urllib.parse import urlencode
+from urllib.parse import urlencode, quote
 import uuid
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, CancelledError, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import brotli  # optionnel : sans lui on ne sert que gzip
+except ImportError:
+    brotli = None
+
+try:
+    # optionnel : sans lui /metrics répond 501. Sous gunicorn, PROMETHEUS_MULTIPROC_DIR
+    # doit être défini AVANT le démarrage (voir gunicorn.conf.py)
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None
 
 app = Flask(__name__)
 CORS(app)
@@ -63,9 +106,32 @@ def load_projects():
         except Exception:
             return {}
 
+def write_json_atomic(path, data):
+    """Écrit le JSON dans un fichier temporaire puis le renomme : jamais de fichier à moitié écrit."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+@contextmanager
+def data_file_lock(path):
+    """Verrou exclusif (inter-processus) autour d'un cycle lecture -> modification -> écriture."""
+    with open(path + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
 def save_projects(projects):
-    with open(PROJECT_FILE, "w", encoding="utf-8") as f:
-        json.dump(projects, f, ensure_ascii=False, indent=4)
+    write_json_atomic(PROJECT_FILE, projects)
 
 def load_nova_projects():
     if not os.path.exists(NOVA_FILE):
@@ -76,12 +142,387 @@ def load_nova_projects():
         except Exception:
             return {}
 
+def save_nova_projects(projects):
+    write_json_atomic(NOVA_FILE, projects)
+
+# ----------------------------
+# Chronométrage par étape (en-tête Server-Timing) et traces échantillonnées
+# ----------------------------
+# Lu au démarrage. Tout désactivé : stage() rend une étape vide partagée, les
+# fonctions @timed_stage ne sont pas enveloppées et aucun hook n'est posé.
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "0") == "1"        # en-tête Server-Timing sur les réponses
+STAGE_TIMING_LOG = os.environ.get("STAGE_TIMING_LOG", "0") == "1"  # une ligne [TIMING] JSON par requête / job
+STAGE_TIMING = SERVER_TIMING or STAGE_TIMING_LOG
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", 0))  # part des requêtes tracées, 0 = traces coupées
+# dans un dossier : sweep_stale_artifacts ne supprime que les fichiers mindix_* isolés
+TRACE_FILE = os.environ.get("TRACE_FILE", os.path.join(tempfile.gettempdir(), "mindix_traces", "traces.jsonl"))
+TRACE_MAX_BYTES = int(os.environ.get("TRACE_MAX_BYTES", 50 * 1024 * 1024))  # au-delà, le fichier passe en .1
+TRACING = TRACE_SAMPLE_RATE > 0
+# "1" seulement derrière un proxy / des appelants de confiance : sinon n'importe quel
+# client forcerait l'échantillonnage (et l'écriture d'une trace) avec traceparent ...-01
+TRACE_TRUST_TRACEPARENT = os.environ.get("TRACE_TRUST_TRACEPARENT", "0") == "1"
+INSTRUMENTED = STAGE_TIMING or TRACING
+# thread courant : .timings = [(nom, secondes, nombre)] (Server-Timing), .trace = Trace échantillonnée
+_STAGE_STATE = threading.local()
+_TIMING_NAME_RE = re.compile(r"[^A-Za-z0-9!#$%&'*+.^_`|~-]")
+_TRACEPARENT_RE = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+class _NullStage:
+    """Étape quand rien n'est collecté : partagée, ne fait rien."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+_NO_STAGE = _NullStage()
+
+class _Stage:
+    """Étape chronométrée (Server-Timing) et/ou span de la trace en cours."""
+    __slots__ = ("name", "attrs", "timings", "trace", "span", "start")
+
+    def __init__(self, name, attrs, timings, trace):
+        self.name, self.attrs, self.timings, self.trace = name, attrs, timings, trace
+        self.span = None
+
+    def __enter__(self):
+        if self.trace is not None:
+            self.span = self.trace.open_span(self.name, self.attrs)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        if self.timings is not None:
+            self.timings.append((self.name, elapsed, 1))
+        if self.span is not None:
+            self.trace.close_span(self.span, elapsed, exc)
+        return False
+
+    def set(self, **attrs):
+        """Attributs du span (chemin, statut, code de sortie...), ignorés hors trace."""
+        self.attrs.update(attrs)
+
+class Trace:
+    """Arbre de spans d'une requête ou d'un job échantillonné, exporté en une ligne JSONL."""
+    def __init__(self, name, trace_id=None, parent_id=None, attrs=None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.spans = []
+        self.stack = []
+        self.started = time.perf_counter()
+        self.root = self.open_span(name, attrs or {}, parent_id)
+
+    def open_span(self, name, attrs, parent_id=None):
+        span = {"span_id": os.urandom(8).hex(),
+                "parent_id": self.stack[-1]["span_id"] if self.stack else parent_id,
+                "name": name, "start": round(time.time(), 6), "duration_ms": None, "attrs": attrs}
+        self.spans.append(span)
+        self.stack.append(span)
+        return span
+
+    def close_span(self, span, elapsed, exc=None):
+        span["duration_ms"] = round(elapsed * 1000, 3)
+        if exc is not None:
+            span["error"] = f"{type(exc).__name__}: {exc}"
+        # les enfants restés ouverts (exception au milieu d'un rendu...) sont dépilés avec lui
+        while self.stack:
+            if self.stack.pop() is span:
+                break
+
+    def finish(self, exc=None):
+        self.close_span(self.root, time.perf_counter() - self.started, exc)
+        return {"trace_id": self.trace_id, "name": self.root["name"], "start": self.root["start"],
+                "duration_ms": self.root["duration_ms"], "spans": self.spans}
+
+def begin_stages():
+    """Démarre la collecte des étapes du thread courant (une requête ou un job)."""
+    _STAGE_STATE.timings = []
+    _STAGE_STATE.started = time.perf_counter()
+
+def end_stages():
+    """Arrête la collecte ; rend ([(nom, secondes, nombre)], durée totale en secondes)."""
+    timings = getattr(_STAGE_STATE, "timings", None)
+    _STAGE_STATE.timings = None
+    if timings is None:
+        return [], 0.0
+    return timings, time.perf_counter() - _STAGE_STATE.started
+
+def stage(name, **attrs):
+    """
+    `with stage("scan") as current:` chronomètre le bloc et/ou en fait un span si une
+    collecte ou une trace est en cours, sinon ne fait rien ; current.set(...) ajoute
+    des attributs au span.
+    """
+    if not INSTRUMENTED:
+        return _NO_STAGE
+    timings = getattr(_STAGE_STATE, "timings", None)
+    trace = getattr(_STAGE_STATE, "trace", None)
+    if timings is None and trace is None:
+        return _NO_STAGE
+    return _Stage(name, attrs, timings, trace)
+
+def timed_stage(name):
+    """Décorateur : chaque appel compte comme l'étape `name`."""
+    def decorator(fn):
+        if not INSTRUMENTED:
+            return fn
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def add_stages(summary, prefix=""):
+    """Ajoute à la collecte courante des étapes mesurées ailleurs (ex: dans le thread d'un job)."""
+    timings = getattr(_STAGE_STATE, "timings", None)
+    if timings is not None and summary:
+        timings.extend((prefix + name, entry["ms"] / 1000, entry["count"]) for name, entry in summary.items())
+
+def summarize_stages(timings):
+    """{nom: {"ms", "count"}} cumulés par nom, dans l'ordre de première apparition."""
+    summary = {}
+    for name, seconds, count in timings:
+        entry = summary.setdefault(name, {"ms": 0.0, "count": 0})
+        entry["ms"] += seconds * 1000
+        entry["count"] += count
+    for entry in summary.values():
+        entry["ms"] = round(entry["ms"], 2)
+    return summary
+
+def server_timing_header(summary, total):
+    parts = []
+    for name, entry in summary.items():
+        part = f"{_TIMING_NAME_RE.sub('_', name)};dur={entry['ms']:.2f}"
+        if entry["count"] > 1:
+            part += f';desc="{entry["count"]}x"'
+        parts.append(part)
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+def log_stages(record, summary, total):
+    record = {**record, "total_ms": round(total * 1000, 2), "stages": summary}
+    print("[TIMING] " + json.dumps(record, ensure_ascii=False))
+
+def sample_request(traceparent):
+    """
+    Échantillonnage en tête : (tracée ?, trace_id, span parent). Un en-tête W3C
+    traceparent valide rattache la trace à l'appelant ; sa décision n'est suivie
+    que si TRACE_TRUST_TRACEPARENT, sinon le taux local s'applique.
+    """
+    match = _TRACEPARENT_RE.match(traceparent or "")
+    if match is None:
+        return random.random() < TRACE_SAMPLE_RATE, None, None
+    if TRACE_TRUST_TRACEPARENT:
+        sampled = int(match.group(3), 16) & 1 == 1
+    else:
+        sampled = random.random() < TRACE_SAMPLE_RATE
+    return sampled, match.group(1), match.group(2)
+
+def begin_trace(name, trace_id=None, parent_id=None, **attrs):
+    _STAGE_STATE.trace = Trace(name, trace_id, parent_id, attrs)
+    return _STAGE_STATE.trace
+
+def current_trace():
+    return getattr(_STAGE_STATE, "trace", None)
+
+def current_trace_context():
+    """(trace_id, span courant) pour rattacher un travail lancé ailleurs (job), ou None hors trace."""
+    trace = current_trace()
+    if trace is None or not trace.stack:
+        return None
+    return trace.trace_id, trace.stack[-1]["span_id"]
+
+def end_trace(exc=None):
+    trace = current_trace()
+    _STAGE_STATE.trace = None
+    if trace is not None:
+        export_trace(trace.finish(exc))
+
+def export_trace(record):
+    """
+    Ajoute la trace à TRACE_FILE (une ligne). Rotation et écriture se font sous
+    flock sur TRACE_FILE.lock : deux workers ne peuvent pas tourner le fichier en
+    même temps (le second écraserait le .1 que le premier vient de produire).
+    """
+    line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+    try:
+        os.makedirs(os.path.dirname(TRACE_FILE) or ".", exist_ok=True)
+        lock_fd = os.open(TRACE_FILE + ".lock", os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            if os.path.exists(TRACE_FILE) and os.path.getsize(TRACE_FILE) > TRACE_MAX_BYTES:
+                os.replace(TRACE_FILE, TRACE_FILE + ".1")
+            fd = os.open(TRACE_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        finally:
+            os.close(lock_fd)  # libère le flock
+    except OSError as e:
+        print(f"[WARN] Trace non écrite : {e}")
+
+def _reset_stages_after_fork():
+    # un worker du pool d'analyse hérite de l'état du thread qui l'a créé :
+    # sans ça il empilerait ses étapes dans une collecte que personne ne lira
+    _STAGE_STATE.timings = None
+    _STAGE_STATE.trace = None
+
+def _start_request_stages():
+    if STAGE_TIMING:
+        begin_stages()
+    if TRACING:
+        sampled, trace_id, parent_id = sample_request(request.headers.get("traceparent"))
+        if sampled:
+            route = request.url_rule.rule if request.url_rule else "<inconnue>"
+            begin_trace(f"{request.method} {route}", trace_id, parent_id, method=request.method, path=request.path)
+
+def _finish_request_stages(response):
+    # enregistré avant les autres after_request : passe en dernier et voit leur durée
+    if STAGE_TIMING:
+        timings, total = end_stages()
+        summary = summarize_stages(timings)
+        if SERVER_TIMING:
+            response.headers["Server-Timing"] = server_timing_header(summary, total)
+        if STAGE_TIMING_LOG:
+            log_stages({"method": request.method, "path": request.path, "status": response.status_code}, summary, total)
+    trace = current_trace()
+    if trace is not None:
+        trace.root["attrs"]["status"] = response.status_code
+        response.headers["X-Trace-Id"] = trace.trace_id
+    return response
+
+def _close_request_stages(exc=None):
+    # après le corps (même streamé) ; aussi quand la vue a levé une exception
+    _STAGE_STATE.timings = None
+    end_trace(exc)
+
+def _template_started(sender, template, context, **extra):
+    current = stage("render", template=template.name)
+    current.__enter__()
+    _STAGE_STATE.render = current
+
+def _template_done(sender, template, context, **extra):
+    current = getattr(_STAGE_STATE, "render", None)
+    _STAGE_STATE.render = None
+    if current is not None:
+        current.__exit__(None, None, None)
+
+if INSTRUMENTED:
+    app.before_request(_start_request_stages)
+    app.after_request(_finish_request_stages)
+    app.teardown_request(_close_request_stages)
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_done, app)
+    os.register_at_fork(after_in_child=_reset_stages_after_fork)
+
+# ----------------------------
+# Métriques Prometheus (/metrics)
+# ----------------------------
+# Avec PROMETHEUS_MULTIPROC_DIR, chaque processus (workers gunicorn, pool d'analyse)
+# écrit ses valeurs dans ce dossier et /metrics les agrège toutes.
+PROMETHEUS_MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+TOOL_DURATION_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LANGUAGE_BY_EXT = {".py": "python", ".js": "javascript", ".cs": "csharp",
+                   ".c": "c", ".h": "c", ".cpp": "cpp", ".hpp": "cpp"}
+
+class _NoMetric:
+    """Remplaçant muet quand prometheus_client n'est pas installé."""
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def observe(self, value):
+        pass
+
+def _metric(kind, name, documentation, labels, **kwargs):
+    if prometheus_client is None:
+        return _NoMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labels, **kwargs)
+
+HTTP_REQUESTS = _metric("Counter", "http_requests_total", "Requêtes HTTP traitées",
+                        ["method", "route", "status"])
+HTTP_DURATION = _metric("Histogram", "http_request_duration_seconds", "Durée des requêtes HTTP (hors corps streamé)",
+                        ["method", "route"])
+STORAGE_DURATION = _metric("Histogram", "remote_storage_duration_seconds", "Durée des appels au stockage distant",
+                           ["operation"])
+STORAGE_ERRORS = _metric("Counter", "remote_storage_errors_total", "Échecs des appels au stockage distant",
+                         ["operation", "reason"])
+MINDIX_SCANS = _metric("Counter", "mindix_scans_total", "Fichiers passés par MINDIX, analysés ou servis par le cache",
+                       ["language", "source"])
+MINDIX_CACHE_LOOKUPS = _metric("Counter", "mindix_scan_cache_lookups_total", "Consultations du cache d'analyse MINDIX",
+                               ["result"])
+TOOL_DURATION = _metric("Histogram", "mindix_tool_duration_seconds", "Durée des outils externes (compilateurs, workers)",
+                        ["tool", "outcome"], buckets=TOOL_DURATION_BUCKETS)
+
+def record_scan(filename, source):
+    """source : "scanned" (analyse réelle) ou "cached"."""
+    MINDIX_SCANS.labels(LANGUAGE_BY_EXT.get(os.path.splitext(filename)[1].lower(), "other"), source).inc()
+
+def observe_tool(tool, outcome, started):
+    TOOL_DURATION.labels(tool, outcome).observe(time.perf_counter() - started)
+
+def storage_error_reason(result):
+    """Raison d'échec d'un appel remote_* d'après ce qu'il renvoie, ou None si réussi."""
+    if result is None:
+        return "unreachable"
+    if isinstance(result, dict):
+        return result.get("error")
+    if getattr(result, "status_code", 200) >= 400:
+        return f"http_{result.status_code}"
+    return None
+
+def remote_call(operation):
+    """
+    Décorateur des helpers remote_* : étape remote-<operation> (Server-Timing, span
+    avec chemin et statut) et métriques de durée / échecs par opération.
+    """
+    def decorator(fn):
+        if prometheus_client is None and not INSTRUMENTED:
+            return fn
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(f"remote-{operation}", path=args[0] if args else None) as current:
+                started = time.perf_counter()
+                result = fn(*args, **kwargs)
+                STORAGE_DURATION.labels(operation).observe(time.perf_counter() - started)
+                reason = storage_error_reason(result)
+                if reason:
+                    STORAGE_ERRORS.labels(operation, reason).inc()
+                current.set(status=getattr(result, "status_code", None), error=reason)
+            return result
+        return wrapper
+    return decorator
+
+def _start_request_metrics():
+    g.metrics_started = time.perf_counter()
+
+def _finish_request_metrics(response):
+    started = g.pop("metrics_started", None)
+    if started is not None:
+        # gabarit de la route (pas l'URL) : nombre de séries borné
+        route = request.url_rule.rule if request.url_rule else "<inconnue>"
+        HTTP_REQUESTS.labels(request.method, route, str(response.status_code)).inc()
+        HTTP_DURATION.labels(request.method, route).observe(time.perf_counter() - started)
+    return response
+
+if prometheus_client is not None:
+    app.before_request(_start_request_metrics)
+    app.after_request(_finish_request_metrics)
+
 # ----------------------------
 # Helpers pour le stockage distant (/files/...)
 # ----------------------------
 def remote_headers():
     return {"X-API-KEY": REMOTE_API_KEY}
 
+@remote_call("list")
 def remote_list_files():
     """Récupère la liste depuis le stockage distant (/files)."""
     try:
@@ -92,6 +533,7 @@ def remote_list_files():
     except requests.RequestException as e:
         return {"error": "unreachable", "detail": str(e)}
 
+@remote_call("get")
 def remote_get_file(path):
     """Télécharge un fichier depuis le stockage distant (/files/<path>)."""
     url = f"{REMOTE_STORAGE_BASE}/files/{path}"
@@ -101,6 +543,7 @@ def remote_get_file(path):
     except requests.RequestException as e:
         return None
 
+@remote_call("upload")
 def remote_upload_file(path, file_stream, filename=None, method="POST"):
     """
     Envoie un fichier vers le stockage distant.
@@ -141,6 +584,7 @@ def remote_upload_file(path, file_stream, filename=None, method="POST"):
         print(f"[ERROR] Upload failed: {e}")
         return None
 
+@remote_call("delete")
 def remote_delete_file(path):
     url = f"{REMOTE_STORAGE_BASE}/files/{path}"
     try:
@@ -149,6 +593,148 @@ def remote_delete_file(path):
     except requests.RequestException:
         return None
 
+# ----------------------------
+# Métadonnées des dépôts GitHub (page nova-life)
+# Rafraîchies en tâche de fond, jamais pendant une requête : une page
+# sert ce qui est en cache (même périmé) et déclenche la revalidation.
+# ----------------------------
+REPO_META_FETCHER = os.environ.get("REPO_META_FETCHER", "github")  # github | fake | none
+REPO_META_TTL = int(os.environ.get("REPO_META_TTL", 3600))          # secondes avant revalidation
+REPO_META_ERROR_RETRY = 300                                          # délai avant de retenter un échec
+GITHUB_API_BASE = "https://api.github.com"
+GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
+
+def parse_github_repo(link):
+    """'https://github.com/owner/repo(.git)' -> 'owner/repo' (None si ce n'est pas un dépôt GitHub)."""
+    m = re.match(r'^https?://(?:www\.)?github\.com/([\w.-]+)/([\w.-]+?)(?:\.git)?/?$', (link or "").strip())
+    return f"{m.group(1)}/{m.group(2)}" if m else None
+
+class GitHubMetadataFetcher:
+    """Étoiles, dernier push et dernière release via l'API GitHub."""
+
+    def __init__(self, token=None, timeout=8):
+        self.timeout = timeout
+        self.headers = {"Accept": "application/vnd.github+json"}
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+
+    def fetch(self, repo):
+        resp = requests.get(f"{GITHUB_API_BASE}/repos/{repo}", headers=self.headers, timeout=self.timeout)
+        resp.raise_for_status()
+        info = resp.json()
+        release = None
+        rel = requests.get(f"{GITHUB_API_BASE}/repos/{repo}/releases/latest", headers=self.headers, timeout=self.timeout)
+        if rel.status_code == 200:
+            release = rel.json().get("tag_name")
+        return {
+            "stars": info.get("stargazers_count", 0),
+            "pushed_at": info.get("pushed_at"),
+            "release": release,
+        }
+
+class FakeMetadataFetcher:
+    """Fetcher local déterministe (dev / tests) : aucun appel réseau."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def fetch(self, repo):
+        self.calls.append(repo)
+        if self.delay:
+            time.sleep(self.delay)
+        digest = int(hashlib.sha1(repo.encode("utf-8")).hexdigest(), 16)
+        return {
+            "stars": digest % 500,
+            "pushed_at": f"2025-{digest % 12 + 1:02d}-{digest % 28 + 1:02d}T12:00:00Z",
+            "release": f"v1.{digest % 10}.0",
+        }
+
+class RepoMetadataCache:
+    """
+    Cache TTL "stale-while-revalidate" : get() ne bloque jamais, renvoie la
+    dernière valeur connue et planifie un rafraîchissement si elle est périmée.
+    """
+
+    def __init__(self, fetcher, ttl=REPO_META_TTL, max_workers=2):
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self._entries = {}      # repo -> {"data", "fetched_at", "error", "retry_at"}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def _submit(self, repo):
+        # exécuteur recréé après un fork (workers gunicorn) : les threads ne survivent pas au fork
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="repo-meta")
+            self._pid = os.getpid()
+            self._pending.clear()
+        self._pending.add(repo)
+        self._executor.submit(self._refresh, repo)
+
+    def _refresh(self, repo):
+        try:
+            data = self.fetcher.fetch(repo)
+            with self._lock:
+                self._entries[repo] = {"data": data, "fetched_at": time.time(), "error": None, "retry_at": 0}
+        except Exception as e:
+            with self._lock:
+                entry = self._entries.setdefault(repo, {"data": None, "fetched_at": 0})
+                entry["error"] = str(e)
+                entry["retry_at"] = time.time() + REPO_META_ERROR_RETRY
+            print(f"[WARN] Métadonnées {repo} indisponibles : {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(repo)
+
+    def get(self, repo):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(repo)
+            fresh = entry is not None and now - entry["fetched_at"] < self.ttl
+            backing_off = entry is not None and now < entry.get("retry_at", 0)
+            if not fresh and not backing_off and repo not in self._pending:
+                self._submit(repo)
+            if entry is None or entry["data"] is None:
+                return None
+            return dict(entry["data"], stale=not fresh)
+
+    def start_refresher(self, links_provider, interval=None):
+        """Thread de fond qui revalide périodiquement tous les dépôts (un par processus)."""
+        with self._lock:
+            if getattr(self, "_refresher_pid", None) == os.getpid():
+                return
+            self._refresher_pid = os.getpid()
+
+        def loop():
+            while True:
+                try:
+                    self.get_many(links_provider())
+                except Exception as e:
+                    print(f"[WARN] Rafraîchissement des métadonnées échoué : {e}")
+                time.sleep(interval or max(self.ttl // 2, 30))
+
+        threading.Thread(target=loop, name="repo-meta-refresher", daemon=True).start()
+
+    def get_many(self, links):
+        """{nom: lien} -> {nom: métadonnées ou None}."""
+        result = {}
+        for name, link in links.items():
+            repo = parse_github_repo(link)
+            result[name] = self.get(repo) if repo else None
+        return result
+
+def make_repo_metadata_cache():
+    if REPO_META_FETCHER == "none":
+        return None
+    fetcher = FakeMetadataFetcher() if REPO_META_FETCHER == "fake" else GitHubMetadataFetcher(GITHUB_TOKEN)
+    return RepoMetadataCache(fetcher)
+
+repo_metadata_cache = make_repo_metadata_cache()
+
 # ----------------------------
 # Fonctions MINDIX (analyse)
 # ----------------------------
@@ -156,6 +742,7 @@ AI_UPLOAD_DIR = "ai_uploads"  # dossier logique sur storage distant
 ALLOWED_EXT = ('.py', '.js', '.cs', '.c', '.cpp', '.h', '.hpp', '.zip', '.tar', '.gz')
 AI_ALLOWED_SINGLE = ('.py', '.js', '.cs', '.c', '.cpp', '.h', '.hpp')
 AI_ALLOWED_ARCHIVE = ('.zip', '.tar', '.gz')
+TIMEOUT_TITLE = "Analyse trop longue"  # diagnostic transitoire : jamais mis en cache
 
 def mindix_analyze_error(tb_text: str):
     tb_lower = tb_text.lower()
@@ -176,12 +763,248 @@ def mindix_analyze_error(tb_text: str):
     else:
         return ("💥 Erreur inconnue", "Problème non identifiable.", "Analyse la logique du code à la ligne indiquée.", 5)
 
+DIVISION_OPS = ("/", "//", "%", "/=", "//=", "%=")
+BRACKET_PAIRS = {")": "(", "]": "[", "}": "{"}
+_SKIPPED_TOKENS = (tokenize.COMMENT, tokenize.NL, tokenize.INDENT, tokenize.DEDENT)
+
+def _is_zero_literal(number: str):
+    try:
+        return ast.literal_eval(number) == 0
+    except (ValueError, SyntaxError):
+        return False
+
+def _token_error(lines, line, col, title, cause, fix, severity):
+    text = lines[line - 1].strip() if 0 < line <= len(lines) else ""
+    return {"line": line, "col": col + 1, "text": text, "title": title, "cause": cause, "fix": fix, "severity": severity}
+
+def mindix_tokenize_scan(code: str, lines=None):
+    """
+    Une seule passe `tokenize` sur le code Python : division par un littéral nul
+    et équilibre des ( [ { / chaînes, avec ligne et colonne exactes. Les chaînes
+    et commentaires sont des tokens à part, donc jamais pris pour du code.
+    """
+    lines = code.splitlines() if lines is None else lines
+    errors = []
+    stack = []          # (caractère ouvrant, ligne, colonne)
+    prev = None         # dernier token significatif
+    try:
+        for tok in tokenize.generate_tokens(StringIO(code).readline):
+            if tok.type in _SKIPPED_TOKENS:
+                continue
+            if tok.type == tokenize.OP:
+                if tok.string in "([{":
+                    stack.append((tok.string, *tok.start))
+                elif tok.string in BRACKET_PAIRS:
+                    if stack and stack[-1][0] == BRACKET_PAIRS[tok.string]:
+                        stack.pop()
+                    else:
+                        errors.append(_token_error(lines, *tok.start, "Erreur de structure",
+                                                   f"'{tok.string}' fermant sans ouvrant correspondant.",
+                                                   "Supprime-le ou ajoute l'ouvrant manquant.", 2))
+            elif tok.type == tokenize.NUMBER:
+                if prev is not None and prev.type == tokenize.OP and prev.string in DIVISION_OPS \
+                        and _is_zero_literal(tok.string):
+                    errors.append(_token_error(lines, *prev.start, "➗ Division par zéro",
+                                               "Division par zéro détectée.", "Vérifie le dénominateur.", 2))
+            elif tok.type == tokenize.ERRORTOKEN and tok.string[:1] in ("'", '"'):
+                errors.append(_token_error(lines, *tok.start, "Chaîne non terminée",
+                                           "Guillemet ouvert sans fermeture sur la ligne.", "Ferme les guillemets.", 3))
+            prev = tok
+    except tokenize.TokenError as e:
+        message, (line, col) = e.args
+        if "string" in message:
+            errors.append(_token_error(lines, line, col, "Chaîne non terminée",
+                                       "Chaîne multi-lignes jamais fermée.", "Ferme les triples guillemets.", 3))
+    for char, line, col in stack:
+        errors.append(_token_error(lines, line, col, "Erreur de structure",
+                                   f"'{char}' ouvert mais jamais fermé.", "Ajoute la fermeture correspondante.", 2))
+    return errors
+
+# ----------------------------
+# Moteur de règles AST (Python) : chaque règle s'enregistre pour des types de
+# nœuds, toutes sont appelées pendant une seule traversée de l'arbre.
+# ----------------------------
+MINDIX_RULES = {}       # type de nœud -> [(nom, règle)]
+MINDIX_RULE_STATS = {}  # nom -> {"calls", "findings", "ns"} (par processus, workers du pool fusionnés)
+# compteurs et chrono par règle : deux appels d'horloge par nœud concerné, donc coupés par défaut
+MINDIX_RULE_STATS_ENABLED = os.environ.get("MINDIX_RULE_STATS", "0") == "1"
+_rule_stats_lock = threading.Lock()
+
+def mindix_rule(*node_types):
+    """Décorateur : `rule(node, visitor)` appelée pour chaque nœud des types donnés."""
+    def decorator(fn):
+        for node_type in node_types:
+            MINDIX_RULES.setdefault(node_type, []).append((fn.__name__, fn))
+        MINDIX_RULE_STATS.setdefault(fn.__name__, {"calls": 0, "findings": 0, "ns": 0})
+        return fn
+    return decorator
+
+def pop_rule_stats():
+    """Compteurs des règles depuis le dernier appel, remis à zéro (worker du pool -> parent)."""
+    with _rule_stats_lock:
+        counts = {name: dict(stats) for name, stats in MINDIX_RULE_STATS.items() if stats["calls"]}
+        for name in counts:
+            MINDIX_RULE_STATS[name].update(calls=0, findings=0, ns=0)
+    return counts
+
+def add_rule_stats(counts):
+    """Ajoute aux compteurs du processus ceux remontés par un worker (pop_rule_stats)."""
+    with _rule_stats_lock:
+        for name, delta in (counts or {}).items():
+            stats = MINDIX_RULE_STATS.setdefault(name, {"calls": 0, "findings": 0, "ns": 0})
+            for key, value in delta.items():
+                stats[key] += value
+
+NOT_CONSTANT = object()
+_FOLD_BINOPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_FOLD_UNARYOPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+_FOLD_MAX_MAGNITUDE = 10 ** 12  # au-delà on arrête de plier (pas de 9**9**9 pendant un scan)
+
+def fold_constant(node):
+    """Valeur numérique d'une expression constante (`1 - 1`, `-(2 * 0.0)`…) ou NOT_CONSTANT."""
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if isinstance(value, (int, float, complex)) and not isinstance(value, bool):
+            return value
+        return NOT_CONSTANT
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _FOLD_UNARYOPS:
+        operand = fold_constant(node.operand)
+        return NOT_CONSTANT if operand is NOT_CONSTANT else _FOLD_UNARYOPS[type(node.op)](operand)
+    if isinstance(node, ast.BinOp) and type(node.op) in _FOLD_BINOPS:
+        left = fold_constant(node.left)
+        if left is NOT_CONSTANT:
+            return NOT_CONSTANT
+        right = fold_constant(node.right)
+        if right is NOT_CONSTANT:
+            return NOT_CONSTANT
+        if isinstance(node.op, ast.Pow) and (abs(right) > 64 or abs(left) > _FOLD_MAX_MAGNITUDE):
+            return NOT_CONSTANT
+        try:
+            value = _FOLD_BINOPS[type(node.op)](left, right)
+        except (ArithmeticError, ValueError, TypeError):
+            return NOT_CONSTANT
+        if abs(value) > _FOLD_MAX_MAGNITUDE:
+            return NOT_CONSTANT
+        return value
+    return NOT_CONSTANT
+
+# champs jamais utiles au parcours : contexte Load/Store, opérateurs (ast.Add()…)
+_SKIPPED_FIELDS = ("ctx", "op", "ops")
+# nœuds sans enfant intéressant : inutile de les empiler
+_LEAF_NODES = (ast.Name, ast.Constant)
+
+class MindixRuleVisitor(ast.NodeVisitor):
+    """Parcours unique de l'arbre, qui distribue chaque nœud aux règles enregistrées pour son type."""
+
+    _child_fields = {}  # type de nœud -> champs à parcourir
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.errors = []
+
+    def report(self, node, title, cause, fix, severity):
+        line = getattr(node, "lineno", 0)
+        self.errors.append({
+            "line": line,
+            "col": getattr(node, "col_offset", -1) + 1,
+            "text": self.lines[line - 1].strip() if 0 < line <= len(self.lines) else "",
+            "title": title,
+            "cause": cause,
+            "fix": fix,
+            "severity": severity
+        })
+
+    def visit(self, node):
+        # pile explicite (pas de RecursionError sur du code très imbriqué) et parcours
+        # des enfants à la main : ast.iter_child_nodes coûte autant que les règles.
+        # Les enfants sont empilés tels quels (pas de liste intermédiaire à inverser) :
+        # l'ordre de visite n'est pas celui du source, les diagnostics sont triés à la fin
+        stack = [node]
+        pop, push = stack.pop, stack.append
+        rules_for = MINDIX_RULES.get
+        fields_for = self._child_fields.get
+        AST, leaves = ast.AST, _LEAF_NODES
+        timed = MINDIX_RULE_STATS_ENABLED
+        while stack:
+            current = pop()
+            cls = type(current)
+            rules = rules_for(cls)
+            if rules:
+                if timed:
+                    self._run_timed(rules, current)
+                else:
+                    for _, rule in rules:
+                        rule(current, self)
+            fields = fields_for(cls)
+            if fields is None:
+                fields = self._child_fields[cls] = tuple(f for f in cls._fields if f not in _SKIPPED_FIELDS)
+            for field in fields:
+                value = getattr(current, field, None)
+                if type(value) is list:
+                    for child in value:
+                        if isinstance(child, AST) and not isinstance(child, leaves):
+                            push(child)
+                elif isinstance(value, AST) and not isinstance(value, leaves):
+                    push(value)
+        self.errors.sort(key=lambda e: (e["line"], e["col"]))
+
+    def _run_timed(self, rules, node):
+        for name, rule in rules:
+            before = len(self.errors)
+            start = time.perf_counter_ns()
+            rule(node, self)
+            elapsed = time.perf_counter_ns() - start
+            stats = MINDIX_RULE_STATS[name]
+            stats["ns"] += elapsed
+            stats["calls"] += 1
+            stats["findings"] += len(self.errors) - before
+
+def mindix_run_rules(tree, lines):
+    visitor = MindixRuleVisitor(lines)
+    visitor.visit(tree)
+    return visitor.errors
+
+_ZERO_DIVISION_OPS = (ast.Div, ast.FloorDiv, ast.Mod)
+
+@mindix_rule(ast.BinOp, ast.AugAssign)
+def rule_zero_division(node, visitor):
+    if not isinstance(node.op, _ZERO_DIVISION_OPS):
+        return
+    right = node.value if isinstance(node, ast.AugAssign) else node.right
+    if fold_constant(right) != 0:  # NOT_CONSTANT != 0 aussi
+        return
+    left = node.target if isinstance(node, ast.AugAssign) else node.left
+    if isinstance(node.op, ast.Mod) and (isinstance(left, ast.JoinedStr)
+                                         or (isinstance(left, ast.Constant) and isinstance(left.value, (str, bytes)))):
+        return  # "%d" % 0 : formatage, pas un modulo
+    visitor.report(node, "➗ Division par zéro", "Division par zéro détectée.", "Vérifie le dénominateur.", 2)
+
+@mindix_rule(ast.ExceptHandler)
+def rule_bare_except(node, visitor):
+    if node.type is None:
+        visitor.report(node, "🪤 except trop large", "`except:` attrape tout, y compris KeyboardInterrupt.",
+                       "Précise l'exception attendue (ex: `except ValueError:`).", 4)
+
+@mindix_rule(ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+def rule_mutable_default(node, visitor):
+    for default in node.args.defaults + [d for d in node.args.kw_defaults if d is not None]:
+        if isinstance(default, (ast.List, ast.Dict, ast.Set)):
+            visitor.report(default, "🧷 Argument par défaut mutable",
+                           "La valeur par défaut est partagée entre tous les appels.",
+                           "Utilise `None` puis crée la liste/le dict dans la fonction.", 4)
+
 def mindix_scan_all_errors(code: str, filename: str):
     errors = []
     lines = code.splitlines()
 
+    tree = None
     try:
-        ast.parse(code, filename)
+        with stage("python-parse"):
+            tree = ast.parse(code, filename)
     except SyntaxError as e:
         tb = traceback.format_exc()
         title, cause, fix, severity = mindix_analyze_error(tb)
@@ -194,19 +1017,13 @@ def mindix_scan_all_errors(code: str, filename: str):
             "severity": severity
         })
 
-    for i, line in enumerate(lines, 1):
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#"):
-            continue
-        if re.search(r'/\s*0(?!\.)', stripped):
-            errors.append({
-                "line": i,
-                "text": stripped,
-                "title": "➗ Division par zéro",
-                "cause": "Division par zéro détectée.",
-                "fix": "Vérifie le dénominateur.",
-                "severity": 2
-            })
+    if tree is not None:
+        with stage("python-rules"):
+            errors += mindix_run_rules(tree, lines)
+    else:
+        # pas d'AST : tokenize localise crochets/chaînes fautifs et les divisions évidentes
+        with stage("python-tokenize"):
+            errors += mindix_tokenize_scan(code, lines)
 
     # dedupe & sort
     seen = set()
@@ -227,35 +1044,322 @@ def heuristic_checks(code: str):
         errs.append({"line":0,"text":"Accolades non équilibrées.","title":"Erreur de structure","cause":"Trop ou pas assez d’accolades.","fix":"Vérifie les blocs { }.","severity":2})
     return errs
 
-def check_with_tool(filepath: str, ext: str):
+# ----------------------------
+# Bac à sable des outils externes : chaque compilateur / vérificateur tourne
+# dans sa propre session avec des rlimits (CPU, mémoire, fichiers ouverts,
+# taille des fichiers écrits, pas de core dump), et un sémaphore global borne
+# le nombre d'outils simultanés. Sémaphore et compteurs sont en mémoire
+# partagée : les workers du pool de scan (fork) comptent dans la même limite.
+# ----------------------------
+MINDIX_MAX_TOOLS = int(os.environ.get("MINDIX_MAX_TOOLS", os.cpu_count() or 1))
+MINDIX_TOOL_QUEUE_TIMEOUT = float(os.environ.get("MINDIX_TOOL_QUEUE_TIMEOUT", 30))  # attente max d'une place
+MINDIX_TOOL_CPU_SECONDS = int(os.environ.get("MINDIX_TOOL_CPU_SECONDS", 20))
+MINDIX_TOOL_MEMORY_BYTES = int(os.environ.get("MINDIX_TOOL_MEMORY_BYTES", 1024 * 1024 * 1024))
+MINDIX_TOOL_MAX_FILES = int(os.environ.get("MINDIX_TOOL_MAX_FILES", 256))
+MINDIX_TOOL_MAX_WRITE_BYTES = 16 * 1024 * 1024
+# V8 réserve des plages d'adresses énormes au démarrage : RLIMIT_AS le tue
+NO_ADDRESS_LIMIT = ("node",)
+STALE_ARTIFACT_SECONDS = 3600
+BUSY_TITLE = "Serveur d'analyse saturé"  # diagnostic transitoire : jamais mis en cache
+TRANSIENT_TITLES = (TIMEOUT_TITLE, BUSY_TITLE)
+
+# Places partagées par tout l'hôte : un fichier verrouillé (flock) par place. Tous les
+# workers gunicorn et les workers du pool d'analyse voient les mêmes places, et le
+# verrou tombe avec le processus qui le tient, même tué par SIGKILL.
+MINDIX_TOOL_SLOTS_DIR = os.environ.get("MINDIX_TOOL_SLOTS_DIR", os.path.join(tempfile.gettempdir(), "mindix_tool_slots"))
+TOOL_SLOT_POLL = 0.02  # secondes entre deux tours des places quand elles sont toutes prises
+# la file d'attente ne se compte pas (un worker arrêté par os._exit ne décompterait
+# jamais) : chaque attente tient un fichier waiting-*.lock verrouillé, compté vivant
+TOOL_STAT_NAMES = ("runs", "rejected", "timeouts", "killed")
+_TOOL_STATS_FORMAT = struct.Struct(f"<{len(TOOL_STAT_NAMES)}q")
+_TOOL_STATS_FILE = os.path.join(MINDIX_TOOL_SLOTS_DIR, "counters.bin")
+os.makedirs(MINDIX_TOOL_SLOTS_DIR, exist_ok=True)
+
+# forkserver : les workers du pool d'analyse naissent d'un processus sans threads
+# (un fork depuis un worker web qui a déjà des threads peut hériter d'un verrou pris)
+MP_CONTEXT = multiprocessing.get_context("forkserver")
+if __name__ != "__main__":
+    MP_CONTEXT.set_forkserver_preload([__name__])
+
+class ToolRejected(Exception):
+    """Pas de place libre pour lancer un outil externe dans le délai imparti."""
+
+def _read_tool_stats(fd):
+    raw = os.pread(fd, _TOOL_STATS_FORMAT.size, 0)
+    if len(raw) < _TOOL_STATS_FORMAT.size:
+        return [0] * len(TOOL_STAT_NAMES)
+    return list(_TOOL_STATS_FORMAT.unpack(raw))
+
+def _tool_stat_add(name, delta=1):
+    """Compteur commun à tous les processus de l'hôte (fichier sous flock)."""
+    fd = os.open(_TOOL_STATS_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        values = _read_tool_stats(fd)
+        values[TOOL_STAT_NAMES.index(name)] += delta
+        os.pwrite(fd, _TOOL_STATS_FORMAT.pack(*values), 0)
+    finally:
+        os.close(fd)
+
+def _lock_free_slot():
+    """fd d'une place libre, verrouillée (la fermer la libère), ou None si toutes sont prises."""
+    for k in range(MINDIX_MAX_TOOLS):
+        fd = os.open(os.path.join(MINDIX_TOOL_SLOTS_DIR, f"slot-{k}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            continue
+        return fd
+    return None
+
+@contextmanager
+def _waiting_for_slot():
+    """
+    Marque l'attente d'une place : fichier verrouillé le temps de l'attente. Le verrou
+    tombe avec le processus, même tué ou arrêté par os._exit sans passer par finally.
+    """
+    tmp_path = os.path.join(MINDIX_TOOL_SLOTS_DIR, f"tmp-{os.getpid()}-{os.urandom(6).hex()}")
+    fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT, 0o644)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    # verrouillé avant d'être visible : count_waiting_tools ne le prend jamais pour un reste
+    path = os.path.join(MINDIX_TOOL_SLOTS_DIR, "waiting-" + os.path.basename(tmp_path)[4:] + ".lock")
+    os.rename(tmp_path, path)
     try:
-        if ext in (".c", ".cpp", ".h", ".hpp"):
-            compiler = "g++" if ext != ".c" else "gcc"
-            cmd = f"{compiler} -fsyntax-only -Wall {shlex.quote(filepath)}"
-        elif ext == ".js":
-            cmd = f"node --check {shlex.quote(filepath)}"
-        elif ext == ".cs":
-            cmd = "mcs -target:library " + shlex.quote(filepath)
+        yield
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        os.close(fd)
+
+def count_waiting_tools():
+    """Attentes en cours sur tout l'hôte ; les fichiers d'attente d'un processus mort sont supprimés."""
+    waiting = 0
+    for entry in os.scandir(MINDIX_TOOL_SLOTS_DIR):
+        if not (entry.name.startswith("waiting-") and entry.name.endswith(".lock")):
+            continue
+        try:
+            fd = os.open(entry.path, os.O_RDWR)
+        except OSError:
+            continue
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            waiting += 1
         else:
-            return []
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        finally:
+            os.close(fd)
+    return waiting
+
+@contextmanager
+def tool_slot(timeout=None):
+    """Réserve une place parmi les MINDIX_MAX_TOOLS outils simultanés de l'hôte, ou lève ToolRejected."""
+    deadline = time.monotonic() + (MINDIX_TOOL_QUEUE_TIMEOUT if timeout is None else timeout)
+    with stage("tool-queue"):
+        fd = _lock_free_slot()
+        if fd is None:
+            with _waiting_for_slot():
+                while fd is None and time.monotonic() < deadline:
+                    time.sleep(TOOL_SLOT_POLL)
+                    fd = _lock_free_slot()
+    if fd is None:
+        _tool_stat_add("rejected")
+        raise ToolRejected(f"aucun outil libre après {MINDIX_TOOL_QUEUE_TIMEOUT:g} s")
+    try:
+        yield
+    finally:
+        os.close(fd)
+
+def tool_limits(cmd, cpu=True):
+    """preexec_fn appliquant les rlimits dans le processus enfant (après fork, avant exec)."""
+    limit_address = os.path.basename(cmd[0]) not in NO_ADDRESS_LIMIT
+
+    def apply():
+        if cpu:
+            resource.setrlimit(resource.RLIMIT_CPU, (MINDIX_TOOL_CPU_SECONDS, MINDIX_TOOL_CPU_SECONDS + 1))
+        if limit_address:
+            resource.setrlimit(resource.RLIMIT_AS, (MINDIX_TOOL_MEMORY_BYTES, MINDIX_TOOL_MEMORY_BYTES))
+        resource.setrlimit(resource.RLIMIT_NOFILE, (MINDIX_TOOL_MAX_FILES, MINDIX_TOOL_MAX_FILES))
+        resource.setrlimit(resource.RLIMIT_FSIZE, (MINDIX_TOOL_MAX_WRITE_BYTES, MINDIX_TOOL_MAX_WRITE_BYTES))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    return apply
+
+_running_tools = set()  # outils lancés par ce processus, tués avec lui par un worker du pool arrêté
+
+def kill_process_group(proc):
+    """Tue l'outil et ses enfants (gcc -> cc1) : ils partagent la session créée au lancement."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    proc.kill()
+
+def run_sandboxed(cmd, input=None, cwd=None, timeout=10):
+    """
+    subprocess.run en bac à sable : place réservée (ToolRejected sinon), rlimits,
+    nouvelle session, groupe entier tué au timeout (TimeoutExpired relevée).
+    FileNotFoundError si l'outil n'est pas installé.
+    """
+    tool = os.path.basename(cmd[0])
+    with tool_slot(), stage(f"tool-{tool}", tool=tool) as current:
+        _tool_stat_add("runs")
+        started = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=cwd, stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                encoding="utf-8", errors="replace",
+                                preexec_fn=tool_limits(cmd), start_new_session=True)
+        _running_tools.add(proc)
+        try:
+            stdout, stderr = proc.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _tool_stat_add("timeouts")
+            kill_process_group(proc)
+            proc.communicate()
+            observe_tool(tool, "timeout", started)
+            current.set(outcome="timeout")
+            raise
+        except BaseException:
+            kill_process_group(proc)
+            proc.wait()
+            observe_tool(tool, "error", started)
+            raise
+        finally:
+            _running_tools.discard(proc)
+        if proc.returncode < 0:
+            _tool_stat_add("killed")  # SIGXCPU, SIGKILL... : limite atteinte
+        observe_tool(tool, "killed" if proc.returncode < 0 else "ok" if proc.returncode == 0 else "exit_nonzero", started)
+        current.set(exit_code=proc.returncode)
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
 
-        proc = subprocess.run(shlex.split(cmd), capture_output=True, text=True, timeout=10)
+def tool_busy_error(label):
+    return [{
+        "line": 0,
+        "text": label,
+        "title": BUSY_TITLE,
+        "cause": "Trop d'analyses en cours, aucun vérificateur libre.",
+        "fix": "Réessaie dans quelques instants.",
+        "severity": 2
+    }]
+
+def count_busy_tool_slots():
+    busy = 0
+    for k in range(MINDIX_MAX_TOOLS):
+        fd = os.open(os.path.join(MINDIX_TOOL_SLOTS_DIR, f"slot-{k}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            busy += 1
+        finally:
+            os.close(fd)
+    return busy
+
+def sandbox_stats():
+    """Compteurs de tout l'hôte (tous workers confondus, depuis la création du fichier de stats)."""
+    fd = os.open(_TOOL_STATS_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH)
+        stats = dict(zip(TOOL_STAT_NAMES, _read_tool_stats(fd)))
+    finally:
+        os.close(fd)
+    stats["active"] = count_busy_tool_slots()
+    stats["waiting"] = count_waiting_tools()
+    stats.update(max_tools=MINDIX_MAX_TOOLS, queue_timeout=MINDIX_TOOL_QUEUE_TIMEOUT,
+                 cpu_seconds=MINDIX_TOOL_CPU_SECONDS, memory_bytes=MINDIX_TOOL_MEMORY_BYTES,
+                 max_files=MINDIX_TOOL_MAX_FILES)
+    return stats
+
+def sweep_stale_artifacts(max_age=STALE_ARTIFACT_SECONDS):
+    """
+    Supprime les fichiers / dossiers mindix_* laissés par un worker tué
+    (SIGKILL, OOM) avant son `finally`. Le cache (mindix_cache) n'est pas touché.
+    """
+    removed = 0
+    now = time.time()
+    for directory in {MINDIX_TMPFS_DIR, tempfile.gettempdir()}:
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.name.startswith("mindix_"):
+                continue
+            try:
+                if now - entry.stat(follow_symlinks=False).st_mtime < max_age:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith("mindix_cc_"):
+                        continue
+                    shutil.rmtree(entry.path)
+                else:
+                    os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+    if removed:
+        print(f"[INFO] {removed} fichier(s) temporaire(s) MINDIX orphelin(s) supprimé(s)")
+    return removed
+
+def tool_command(filepath: str, ext: str):
+    if ext in (".c", ".cpp", ".h", ".hpp"):
+        compiler = "g++" if ext != ".c" else "gcc"
+        return [compiler, "-fsyntax-only", "-Wall", filepath]
+    if ext == ".js":
+        return ["node", "--check", filepath]
+    if ext == ".cs":
+        return ["mcs", "-target:library", filepath]
+    return None
+
+def run_checker(cmd, stdin_text=None, parse=None):
+    try:
+        proc = run_sandboxed(cmd, input=stdin_text, timeout=10)
         out = proc.stderr + proc.stdout
         if proc.returncode != 0:
-            return parse_tool_output_to_errors(out)
+            return (parse or parse_tool_output_to_errors)(out)
         return []
     except FileNotFoundError:
         return None
+    except ToolRejected:
+        return tool_busy_error(os.path.basename(cmd[0]))
     except subprocess.TimeoutExpired:
         return [{
             "line": 0,
             "text": "Timeout",
-            "title": "Analyse trop longue",
+            "title": TIMEOUT_TITLE,
             "cause": "Le vérificateur a pris trop de temps.",
             "fix": "Réessaie plus tard.",
             "severity": 2
         }]
 
+def check_with_tool(filepath: str, ext: str):
+    cmd = tool_command(filepath, ext)
+    if cmd is None:
+        return []
+    return run_checker(cmd, parse=TOOL_OUTPUT_PARSERS.get(ext))
+
+def parse_node_check_output(output_text: str):
+    """
+    Sortie de `node --check` : "<fichier>:<ligne>", le source, le curseur, puis
+    "SyntaxError: ..." et la pile de node -> une seule erreur, sans la pile.
+    """
+    position = re.search(r'^(?:\[stdin\]|\S+\.[cm]?js):(\d+)$', output_text, re.MULTILINE)
+    message = re.search(r'^\w*Error: .*$', output_text, re.MULTILINE)
+    if message is None:
+        return parse_tool_output_to_errors(output_text)
+    return [{
+        "line": int(position.group(1)) if position else 0,
+        "text": message.group(0),
+        "title": "Erreur de syntaxe",
+        "cause": message.group(0),
+        "fix": "Vérifie la syntaxe.",
+        "severity": 3
+    }]
+
 def parse_tool_output_to_errors(output_text: str):
     errors = []
     for line in output_text.splitlines():
@@ -274,96 +1378,1387 @@ def parse_tool_output_to_errors(output_text: str):
         })
     return errors
 
-def mindix_scan_file_from_content(content: str, filename: str):
-    ext = os.path.splitext(filename)[1].lower()
+# ----------------------------
+# Entrée des outils externes sans fichier temporaire : le contenu passe par
+# stdin quand l'outil sait le lire (gcc/g++ `-x <langage> -`, `node --check -`),
+# sinon par un fichier sur tmpfs (/dev/shm) supprimé aussitôt.
+# (memfd testé : node résout le chemin /proc/self/fd/N et échoue, mcs absent ici.)
+# ----------------------------
+def _default_tmpfs_dir():
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
 
-    if ext == ".py":
-        return mindix_scan_all_errors(content, filename)
+MINDIX_TMPFS_DIR = os.environ.get("MINDIX_TMPFS_DIR") or _default_tmpfs_dir()
+sweep_stale_artifacts()  # au démarrage : restes d'un worker tué avant son nettoyage
+
+STDIN_TOOL_CMDS = {
+    ".js": ["node", "--check", "-"],
+}
+# node lit stdin comme du CommonJS : ces erreurs signalent en fait un module ES, revérifié
+# comme tel (ce que fait `node --check fichier.js` en détectant les modules)
+ESM_SYNTAX_ERRORS = (
+    "Cannot use import statement outside a module",
+    "Unexpected token 'export'",
+    "Cannot use 'import.meta' outside a module",
+    "await is only valid in async functions and the top level bodies of modules",
+)
+STDIN_MODULE_CMDS = {
+    ".js": ["node", "--input-type=module", "--check", "-"],
+}
+TOOL_OUTPUT_PARSERS = {".js": parse_node_check_output}
+# diagnostics qui n'existent que parce que le fichier arrive par stdin
+STDIN_ARTIFACTS = ("#pragma once in main file",)
+
+def is_esm_syntax_error(errors):
+    return any(marker in e.get("text", "") for e in errors for marker in ESM_SYNTAX_ERRORS)
+
+def c_stdin_command(ext: str):
+    """gcc/g++ lisant le source sur stdin (les en-têtes sont vérifiés comme du C++)."""
+    language = "c" if ext == ".c" else "c++"
+    return [c_compiler_for(ext), "-x", language] + CC_FLAGS + ["-"]
 
-    # autres langages : écrire temporaire pour l'outil
+@contextmanager
+def tmpfs_source(content: str, ext: str):
+    """Fichier source temporaire sur tmpfs, supprimé en sortie quoi qu'il arrive."""
+    fd, path = tempfile.mkstemp(prefix="mindix_", suffix=ext, dir=MINDIX_TMPFS_DIR)
     try:
-        tmp_path = os.path.join(tempfile.gettempdir(), f"mindix_tmp_{os.getpid()}_{os.urandom(6).hex()}{ext}")
-        with open(tmp_path, "w", encoding="utf-8", errors="replace") as f:
+        with os.fdopen(fd, "w", encoding="utf-8", errors="replace") as f:
             f.write(content)
-        result = check_with_tool(tmp_path, ext)
+        yield path
+    finally:
         try:
-            os.remove(tmp_path)
-        except Exception:
+            os.remove(path)
+        except OSError:
             pass
-        if result is None:
-            return heuristic_checks(content)
-        return result or heuristic_checks(content)
-    except Exception:
-        return heuristic_checks(content)
 
-def mindix_scan_file(filepath: str, filename: str):
-    ext = os.path.splitext(filename)[1].lower()
-    with open(filepath, "r", encoding="utf-8", errors="replace") as f:
-        code = f.read()
-    errors = []
-    if ext == ".py":
-        errors = mindix_scan_all_errors(code, filename) + heuristic_checks(code)
-    else:
-        errors = heuristic_checks(code)
-    corrected = correct_code_simple(code)
-    return errors, corrected
+def check_content_with_tool(content: str, ext: str):
+    """Comme check_with_tool, mais à partir du contenu (stdin ou tmpfs)."""
+    cmd = STDIN_TOOL_CMDS.get(ext)
+    if cmd is not None:
+        parse = TOOL_OUTPUT_PARSERS.get(ext)
+        errors = run_checker(cmd, stdin_text=content, parse=parse)
+        if ext in STDIN_MODULE_CMDS and errors and is_esm_syntax_error(errors):
+            errors = run_checker(STDIN_MODULE_CMDS[ext], stdin_text=content, parse=parse)
+        return errors
+    if tool_command("", ext) is None:
+        return []
+    with tmpfs_source(content, ext) as path:
+        return check_with_tool(path, ext)
 
-def correct_code_simple(code: str):
-    corrected = code
-    corrected = re.sub(r'^( *)\t', r'\1    ', corrected, flags=re.MULTILINE)
-    # attempt simple bracket/paren balancing (naïf)
-    if corrected.count('(') > corrected.count(')'):
-        corrected += ')' * (corrected.count('(') - corrected.count(')'))
-    if corrected.count('{') > corrected.count('}'):
-        corrected += '}' * (corrected.count('{') - corrected.count('}'))
-    for quote in ('"', "'"):
-        if corrected.count(quote) % 2 != 0:
-            corrected += quote
-    return corrected
+# ----------------------------
+# Vérificateurs persistants (JS / C#) : un processus longue durée par langage
+# et par processus Python, qui reçoit les fichiers en JSON ligne à ligne sur
+# stdin au lieu d'un `node --check` / `mcs` par fichier.
+# Protocole : {"id", "op": "ping"|"check", "filename", "source"} ->
+#             {"id", "ok", "errors": [{"line", "col", "message"}]}
+# ----------------------------
+MINDIX_WORKER_MAX_JOBS = int(os.environ.get("MINDIX_WORKER_MAX_JOBS", 500))   # recyclage après N fichiers
+MINDIX_WORKER_TIMEOUT = float(os.environ.get("MINDIX_WORKER_TIMEOUT", 10))
+MINDIX_WORKER_IDLE_PING = 30  # secondes d'inactivité avant de revérifier la santé du worker
+# mcs n'a pas de mode serveur : un service compatible (ex: Roslyn) peut être branché ici
+MINDIX_CS_WORKER_CMD = os.environ.get("MINDIX_CS_WORKER_CMD")
 
-def extract_archive(file_path):
-    temp_dir = tempfile.mkdtemp()
-    try:
-        if zipfile.is_zipfile(file_path):
-            with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir)
-        elif tarfile.is_tarfile(file_path):
-            with tarfile.open(file_path, 'r:*') as tar_ref:
-                tar_ref.extractall(temp_dir)
-        else:
+NODE_CHECKER_SOURCE = r"""
+const vm = require('vm');
+const readline = require('readline');
+const CJS_ARGS = ['exports', 'require', 'module', '__filename', '__dirname'];
+const ESM_SYNTAX_ERRORS = __ESM_SYNTAX_ERRORS__;
+// module ES valide ? (vm.SourceTextModule : node --experimental-vm-modules ; ne donne
+// pas la position d'une erreur, le parent revérifie alors en un-coup)
+function parsesAsModule(req) {
+    if (!vm.SourceTextModule) return false;
+    try { new vm.SourceTextModule(req.source, { identifier: req.filename }); return true; } catch (e) { return false; }
+}
+readline.createInterface({ input: process.stdin }).on('line', (line) => {
+    let req;
+    try { req = JSON.parse(line); } catch (e) { return; }
+    const res = { id: req.id, ok: true, errors: [] };
+    if (req.op === 'check') {
+        try {
+            // même enveloppe CommonJS que `node --check`
+            vm.compileFunction(req.source, CJS_ARGS, { filename: req.filename });
+        } catch (e) {
+            // comme `node --check fichier.js` : une erreur propre aux modules ES fait
+            // revérifier le source comme module
+            if (!(ESM_SYNTAX_ERRORS.some((m) => String(e.message).includes(m)) && parsesAsModule(req))) {
+                const stack = String(e.stack || '').split('\n');
+                const m = /:(\d+)$/.exec(stack[0] || '');
+                const caret = (stack[2] || '').indexOf('^');
+                res.errors.push({ line: m ? Number(m[1]) : 0, col: caret + 1, message: `${e.name}: ${e.message}` });
+            }
+        }
+    }
+    process.stdout.write(JSON.stringify(res) + '\n');
+});
+"""
+
+class PersistentChecker:
+    def __init__(self, name, cmd, max_jobs=MINDIX_WORKER_MAX_JOBS, timeout=MINDIX_WORKER_TIMEOUT):
+        self.name = name
+        self.cmd = cmd
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        self._proc = None
+        self._pid = None        # processus Python propriétaire (pas de partage après fork)
+        self._jobs = 0
+        self._next_id = 0
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+        self.counters = {"starts": 0, "recycles": 0, "failures": 0, "jobs": 0}
+
+    def _alive(self):
+        return self._proc is not None and self._pid == os.getpid() and self._proc.poll() is None
+
+    def _stop(self):
+        if self._proc is not None and self._pid == os.getpid():
+            try:
+                self._proc.kill()
+                self._proc.wait(timeout=2)
+            except Exception:
+                pass
+        self._proc = None
+
+    def _start(self):
+        self._stop()
+        # mêmes rlimits que les outils un-coup, sauf le CPU (cumulé sur toute la vie du worker)
+        self._proc = subprocess.Popen(self.cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                      stderr=subprocess.DEVNULL, text=True, encoding="utf-8", bufsize=1,
+                                      preexec_fn=tool_limits(self.cmd, cpu=False), start_new_session=True)
+        self._pid = os.getpid()
+        self._jobs = 0
+        self.counters["starts"] += 1
+        if self._request({"op": "ping"}) is None:
+            self._stop()
+            raise OSError(f"{self.name}: le worker ne répond pas au ping")
+
+    def _request(self, payload):
+        self._next_id += 1
+        payload["id"] = self._next_id
+        try:
+            self._proc.stdin.write(json.dumps(payload) + "\n")
+            self._proc.stdin.flush()
+            deadline = time.monotonic() + self.timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select([self._proc.stdout], [], [], remaining)[0]:
+                    return None
+                line = self._proc.stdout.readline()
+                if not line:
+                    return None  # EOF : le worker est mort
+                response = json.loads(line)
+                if response.get("id") == payload["id"]:
+                    return response
+        except (OSError, ValueError):
             return None
-    except Exception:
-        return None
-    return temp_dir
 
-def repackage_files(directory, original_filename):
-    zip_path = os.path.join(tempfile.gettempdir(), f"corrected_{original_filename}.zip")
-    with zipfile.ZipFile(zip_path, 'w') as zipf:
-        for root, _, files in os.walk(directory):
-            for f in files:
-                full_path = os.path.join(root, f)
-                arcname = os.path.relpath(full_path, directory)
-                zipf.write(full_path, arcname)
-    return zip_path
+    def check(self, filename, source):
+        """
+        Liste d'erreurs brutes [{"line", "col", "message"}], ou None si le worker est
+        indisponible. Occupe une place d'outil le temps de la requête (ToolRejected sinon).
+        """
+        with self._lock, tool_slot(), stage(f"worker-{self.name}", tool=self.name) as current:
+            try:
+                if not self._alive():
+                    self._start()
+                elif self._jobs >= self.max_jobs:
+                    self.counters["recycles"] += 1
+                    self._start()
+                elif time.monotonic() - self._last_used > MINDIX_WORKER_IDLE_PING and self._request({"op": "ping"}) is None:
+                    self._start()
+            except OSError:
+                self.counters["failures"] += 1
+                self._stop()
+                return None
 
-# ----------------------------
-# Routes principales (pages)
-# ----------------------------
-@app.route('/')
-def root():
-    return redirect(url_for('home'))
+            started = time.perf_counter()
+            response = self._request({"op": "check", "filename": filename, "source": source})
+            self._last_used = time.monotonic()
+            observe_tool(f"worker-{self.name}", "ok" if response is not None else "failed", started)
+            current.set(ok=response is not None)
+            if response is None:
+                # timeout ou crash : on jette le worker, l'appelant repasse en mode un-coup
+                self.counters["failures"] += 1
+                self._stop()
+                return None
+            self._jobs += 1
+            self.counters["jobs"] += 1
+            return response.get("errors", [])
 
-@app.route("/home")
-def home():
-    if 'username' in session:
-        return render_template("home.html", logged_in=True)
-    else:
-        return render_template("home.html", logged_in=False)
+    def close(self):
+        with self._lock:
+            self._stop()
 
+PERSISTENT_CHECKERS = {".js": PersistentChecker("node", ["node", "--experimental-vm-modules", "-e",
+                                                         NODE_CHECKER_SOURCE.replace("__ESM_SYNTAX_ERRORS__", json.dumps(ESM_SYNTAX_ERRORS))])}
+if MINDIX_CS_WORKER_CMD:
+    PERSISTENT_CHECKERS[".cs"] = PersistentChecker("csharp", shlex.split(MINDIX_CS_WORKER_CMD))
 
-@app.route('/project')
-def project():
-    admin_ips = load_admin_ips()
+@atexit.register
+def _close_persistent_checkers():
+    for checker in PERSISTENT_CHECKERS.values():
+        checker.close()
+
+def check_with_worker(content: str, filename: str, ext: str):
+    """Erreurs MINDIX via le worker persistant de l'extension, ou None (-> chemin un-coup)."""
+    checker = PERSISTENT_CHECKERS.get(ext)
+    if checker is None:
+        return None
+    try:
+        raw = checker.check(os.path.basename(filename), content)
+    except ToolRejected:
+        return tool_busy_error(filename)
+    if raw is None:
+        return None
+    errors = [{
+        "line": e.get("line", 0),
+        "col": e.get("col", 0),
+        "text": e.get("message", ""),
+        "title": "Erreur de syntaxe",
+        "cause": e.get("message", ""),
+        "fix": "Vérifie la syntaxe.",
+        "severity": 3
+    } for e in raw]
+    if ext in STDIN_MODULE_CMDS and is_esm_syntax_error(errors):
+        # module ES invalide : le worker ne sait pas situer l'erreur, node --check si
+        return run_checker(STDIN_MODULE_CMDS[ext], stdin_text=content, parse=TOOL_OUTPUT_PARSERS.get(ext))
+    return errors
+
+def _mindix_scan_content_uncached(content: str, filename: str):
+    ext = os.path.splitext(filename)[1].lower()
+
+    if ext == ".py":
+        return mindix_scan_all_errors(content, filename)
+
+    if ext in C_FAMILY_EXT:
+        result = check_c_family_files([(filename, content)])
+        return heuristic_checks(content) if result is None else result[0]
+
+    result = check_with_worker(content, filename, ext)
+    if result is not None:
+        return result or heuristic_checks(content)
+
+    # pas de worker : outil un-coup, contenu par stdin ou tmpfs
+    try:
+        result = check_content_with_tool(content, ext)
+        if result is None:
+            return heuristic_checks(content)
+        return result or heuristic_checks(content)
+    except Exception:
+        return heuristic_checks(content)
+
+# ----------------------------
+# C / C++ : un appel du compilateur par lot de fichiers (et non par fichier),
+# dans un dossier temporaire qui reproduit l'arborescence de l'archive pour
+# que les #include "..." entre fichiers se résolvent.
+# ----------------------------
+C_FAMILY_EXT = (".c", ".cpp", ".h", ".hpp")
+MINDIX_CC_BATCH_SIZE = int(os.environ.get("MINDIX_CC_BATCH_SIZE", 32))
+CC_TIMEOUT = 10                  # secondes pour un fichier, +1 s par fichier en plus dans le lot
+CC_FLAGS = ["-fsyntax-only", "-Wall", "-fno-diagnostics-show-caret", "-fdiagnostics-color=never", "-I."]
+_INCLUDE_RE = re.compile(r'^[ \t]*#[ \t]*include[ \t]*"([^"\n]+)"', re.MULTILINE)
+_CC_DIAG_RE = re.compile(r'^(?P<path>[^:\n]+):(?P<line>\d+):(?:(?P<col>\d+):)?\s*(?P<kind>fatal error|error|warning):\s*(?P<msg>.*)$')
+
+def c_compiler_for(ext: str):
+    return "gcc" if ext == ".c" else "g++"
+
+def safe_member_path(name: str):
+    """Chemin relatif normalisé d'un membre d'archive, ou None s'il sort du dossier (../, absolu)."""
+    path = posixpath.normpath(name.replace("\\", "/")).lstrip("/")
+    if not path or path == "." or path.startswith("../") or path == "..":
+        return None
+    return path
+
+def resolve_include_closure(name: str, files: dict, includes_of=None):
+    """
+    Fichiers de `files` atteints (transitivement) par les #include "..." de `name`.
+    `includes_of(nom)` donne les includes d'un fichier ; par défaut ils sont lus
+    dans son contenu (`files` = {nom: contenu}).
+    """
+    if includes_of is None:
+        includes_of = lambda n: _INCLUDE_RE.findall(files[n]) if files.get(n) else ()
+    by_path = {safe_member_path(n): n for n in files}
+    start = safe_member_path(name)
+    seen, todo = set(), [start]
+    while todo:
+        current = todo.pop()
+        if current not in by_path:
+            continue
+        for inc in includes_of(by_path[current]):
+            for candidate in (posixpath.normpath(posixpath.join(posixpath.dirname(current), inc)), posixpath.normpath(inc)):
+                if candidate in by_path and candidate != start:
+                    if candidate not in seen:
+                        seen.add(candidate)
+                        todo.append(candidate)
+                    break
+    return sorted(by_path[p] for p in seen)
+
+def c_family_content_hash(content: str, closure, files: dict):
+    """Hash du fichier + de ses includes locaux : un en-tête modifié invalide tous ses includeurs."""
+    return c_family_closure_hash(content_sha256(content), [(dep, content_sha256(files[dep])) for dep in closure])
+
+def c_family_closure_hash(content_hash: str, deps):
+    """Même hash, à partir des seuls hashes : deps = [(chemin, hash du contenu)] de la fermeture."""
+    if not deps:
+        return content_hash
+    h = hashlib.sha256(content_hash.encode("ascii"))
+    for dep, dep_hash in deps:
+        h.update(f"|{safe_member_path(dep)}:{dep_hash}".encode("utf-8"))
+    return h.hexdigest()
+
+def parse_cc_diagnostics(output_text: str, targets: dict):
+    """Sortie gcc/g++ -> {chemin relatif: [erreurs]} pour les chemins de `targets` uniquement."""
+    found = {path: [] for path in targets}
+    seen = set()
+    for raw in output_text.splitlines():
+        m = _CC_DIAG_RE.match(raw.strip())
+        if not m:
+            continue
+        path = posixpath.normpath(m.group("path"))
+        if path not in found:
+            continue  # diagnostic dans un fichier hors du lot (ou système)
+        is_error = m.group("kind") != "warning"
+        text = f"{m.group('line')}:{m.group('col') or 0}: {m.group('kind')}: {m.group('msg')}"
+        if (path, text) in seen:
+            continue
+        seen.add((path, text))
+        found[path].append({
+            "line": int(m.group("line")),
+            "col": int(m.group("col") or 0),
+            "text": text,
+            "title": "Erreur de syntaxe" if is_error else "Avertissement",
+            "cause": m.group("msg"),
+            "fix": "Vérifie la syntaxe.",
+            "severity": 3 if is_error else 4
+        })
+    return found
+
+def _check_c_family_stdin(name: str, content: str):
+    """
+    Fichier C/C++ isolé : le compilateur lit le source sur stdin, aucun fichier écrit.
+    Il tourne dans un dossier vide : depuis stdin, #include "x.h" (et -I.) se résolvent
+    dans le dossier courant, qui serait sinon celui du serveur.
+    """
+    ext = os.path.splitext(name)[1].lower()
+    workdir = tempfile.mkdtemp(prefix="mindix_cc_", dir=MINDIX_TMPFS_DIR)
+    try:
+        proc = run_sandboxed(c_stdin_command(ext), input=content, cwd=workdir, timeout=CC_TIMEOUT)
+    except FileNotFoundError:
+        return None
+    except ToolRejected:
+        return [tool_busy_error(name)]
+    except subprocess.TimeoutExpired:
+        return [scan_timeout_error(name)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    errors = [e for e in parse_cc_diagnostics(proc.stderr + proc.stdout, {"<stdin>": name})["<stdin>"]
+              if e["cause"] not in STDIN_ARTIFACTS]
+    return [errors or heuristic_checks(content)]
+
+def check_c_family_files(pairs, support=None):
+    """
+    Vérifie [(nom, contenu)] C/C++ avec un seul appel gcc et/ou g++ et renvoie
+    les erreurs de chaque fichier dans le même ordre. `support` ({nom: contenu})
+    sont les autres fichiers de l'archive, écrits pour résoudre les includes
+    mais pas vérifiés. None si le compilateur est absent.
+    """
+    if not support and len(pairs) == 1:
+        return _check_c_family_stdin(*pairs[0])
+
+    workdir = tempfile.mkdtemp(prefix="mindix_cc_", dir=MINDIX_TMPFS_DIR)
+    try:
+        files = dict(support or {})
+        files.update(pairs)
+        for name, content in files.items():
+            rel = safe_member_path(name)
+            if rel is None:
+                continue
+            full = os.path.join(workdir, rel)
+            os.makedirs(os.path.dirname(full), exist_ok=True)
+            with open(full, "w", encoding="utf-8", errors="replace") as f:
+                f.write(content)
+
+        groups = {}
+        for name, _ in pairs:
+            rel = safe_member_path(name)
+            if rel is not None:
+                groups.setdefault(c_compiler_for(os.path.splitext(rel)[1].lower()), {})[rel] = name
+
+        by_name = {}
+        for compiler, targets in groups.items():
+            try:
+                proc = run_sandboxed([compiler] + CC_FLAGS + list(targets), cwd=workdir,
+                                     timeout=CC_TIMEOUT + len(targets) - 1)
+            except FileNotFoundError:
+                return None
+            except ToolRejected:
+                for name in targets.values():
+                    by_name[name] = tool_busy_error(name)
+                continue
+            except subprocess.TimeoutExpired:
+                for name in targets.values():
+                    by_name[name] = scan_timeout_error(name)
+                continue
+            for rel, errors in parse_cc_diagnostics(proc.stderr + proc.stdout, targets).items():
+                by_name[targets[rel]] = errors
+        return [by_name.get(name) or heuristic_checks(content) for name, content in pairs]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+# ----------------------------
+# Cache des résultats MINDIX : (hash du contenu, extension, version de
+# l'analyseur, version de l'outil) -> erreurs. Tier mémoire LRU + tier disque.
+# ----------------------------
+MINDIX_ANALYZER_VERSION = "2.5"  # à incrémenter dès que les règles d'analyse changent
+MINDIX_CACHE_DIR = os.environ.get("MINDIX_CACHE_DIR", os.path.join(tempfile.gettempdir(), "mindix_cache"))
+MINDIX_CACHE_MEMORY_ENTRIES = int(os.environ.get("MINDIX_CACHE_MEMORY_ENTRIES", 4096))
+MINDIX_CACHE_DISK_MAX_BYTES = int(os.environ.get("MINDIX_CACHE_DISK_MAX_BYTES", 256 * 1024 * 1024))
+
+TOOLCHAIN_VERSION_CMDS = {
+    ".c": ["gcc", "--version"],
+    ".cpp": ["g++", "--version"],
+    ".h": ["g++", "--version"],
+    ".hpp": ["g++", "--version"],
+    ".js": ["node", "--version"],
+    ".cs": ["mcs", "--version"],
+}
+
+@functools.lru_cache(maxsize=None)
+def toolchain_version(ext: str):
+    """Première ligne de `<outil> --version` (ou 'absent'), une fois par processus."""
+    if ext == ".py":
+        return "python-" + ".".join(map(str, sys.version_info[:3]))
+    cmd = TOOLCHAIN_VERSION_CMDS.get(ext)
+    if not cmd:
+        return "none"
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
+        out = (proc.stdout or proc.stderr).strip().splitlines()
+        return out[0] if out else "unknown"
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return "absent"
+
+def content_sha256(content: str):
+    return hashlib.sha256(content.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+def scan_cache_key(content_hash: str, ext: str):
+    raw = f"{content_hash}|{ext}|{MINDIX_ANALYZER_VERSION}|{toolchain_version(ext)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def include_index_key(content_hash: str):
+    """
+    Entrée de cache listant les #include "..." d'un fichier C/C++ ([{"include": ...}]) :
+    permet de recalculer sa fermeture d'includes à partir d'un manifeste de hashes.
+    """
+    return hashlib.sha256(f"includes|{content_hash}".encode("ascii")).hexdigest()
+
+def text_hash_key(raw_sha256: str):
+    """
+    Entrée de cache [{"sha256": ...}] : hash du texte décodé d'un fichier connu par le
+    sha256 de ses octets. Les manifestes donnent le second, le cache est indexé sur le
+    premier ; ils ne diffèrent que pour un BOM, du latin-1, de l'UTF-16...
+    """
+    return hashlib.sha256(f"text|{raw_sha256}".encode("ascii")).hexdigest()
+
+class ScanResultCache:
+    def __init__(self, directory, memory_entries, disk_max_bytes):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None  # calculé paresseusement au premier put
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "disk_evictions": 0}
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def _remember(self, key, errors):
+        self._memory[key] = errors
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key):
+        """(entrée ou None, "memory_hit" / "disk_hit" / "miss"), sans rien compter."""
+        with self._lock:
+            errors = self._memory.get(key)
+            if errors is not None:
+                self._memory.move_to_end(key)
+                return [dict(e) for e in errors], "memory_hit"
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                errors = json.load(f)
+            os.utime(path)  # l'éviction disque se fait sur la date d'accès
+        except (OSError, ValueError):
+            return None, "miss"
+        with self._lock:
+            self._remember(key, errors)
+        return [dict(e) for e in errors], "disk_hit"
+
+    def get(self, key):
+        errors, outcome = self._lookup(key)
+        with self._lock:
+            self.counters[{"memory_hit": "memory_hits", "disk_hit": "disk_hits", "miss": "misses"}[outcome]] += 1
+        MINDIX_CACHE_LOOKUPS.labels(outcome).inc()
+        return errors
+
+    def peek(self, key):
+        """Comme get, sans compter de hit / miss : index internes (includes, hashes de texte)."""
+        return self._lookup(key)[0]
+
+    def contains(self, key):
+        """Présence de l'entrée, sans la lire ni compter de hit / miss."""
+        with self._lock:
+            if key in self._memory:
+                return True
+        return os.path.exists(self._path(key))
+
+    def put(self, key, errors):
+        if any(e.get("title") in TRANSIENT_TITLES for e in errors):
+            return
+        errors = [dict(e) for e in errors]
+        with self._lock:
+            self._remember(key, errors)
+            self.counters["stores"] += 1
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = json.dumps(errors, ensure_ascii=False).encode("utf-8")
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[WARN] Cache MINDIX non écrit : {e}")
+            return
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_usage()[0]
+            else:
+                self._disk_bytes += len(data)
+            over = self._disk_bytes > self.disk_max_bytes
+        if over:
+            self.evict_disk()
+
+    def _scan_disk_usage(self):
+        entries, total = [], 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                full = os.path.join(root, name)
+                try:
+                    st = os.stat(full)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, full))
+                total += st.st_size
+        return total, entries
+
+    def evict_disk(self):
+        """Supprime les entrées les moins récemment utilisées jusqu'à 90 % du plafond."""
+        total, entries = self._scan_disk_usage()
+        target = self.disk_max_bytes * 0.9
+        evicted = 0
+        for _, size, full in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(full)
+                total -= size
+                evicted += 1
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+            self.counters["disk_evictions"] += evicted
+
+    def stats(self):
+        with self._lock:
+            c = dict(self.counters)
+            c["memory_entries"] = len(self._memory)
+            c["disk_bytes"] = self._disk_bytes
+        lookups = c["memory_hits"] + c["disk_hits"] + c["misses"]
+        c["hit_rate"] = round((c["memory_hits"] + c["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return c
+
+scan_cache = ScanResultCache(MINDIX_CACHE_DIR, MINDIX_CACHE_MEMORY_ENTRIES, MINDIX_CACHE_DISK_MAX_BYTES)
+
+def mindix_scan_file_from_content(content: str, filename: str):
+    """Analyse un fichier, en réutilisant le résultat d'un contenu identique déjà analysé."""
+    key = scan_cache_key(content_sha256(content), os.path.splitext(filename)[1].lower())
+    errors = scan_cache.get(key)
+    if errors is None:
+        errors = _mindix_scan_content_uncached(content, filename)
+        scan_cache.put(key, errors)
+        record_scan(filename, "scanned")
+    else:
+        record_scan(filename, "cached")
+    return errors
+
+# ----------------------------
+# Scan parallèle (archives) : pool de processus partagé
+# ----------------------------
+MINDIX_SCAN_WORKERS = int(os.environ.get("MINDIX_SCAN_WORKERS", os.cpu_count() or 1))
+# fichiers soumis en même temps au pool (au-delà, ils attendent côté appelant)
+MINDIX_SCAN_MAX_INFLIGHT = int(os.environ.get("MINDIX_SCAN_MAX_INFLIGHT", MINDIX_SCAN_WORKERS))
+MINDIX_FILE_TIMEOUT = float(os.environ.get("MINDIX_FILE_TIMEOUT", 30))
+MINDIX_PARALLEL_MIN_FILES = 4  # en dessous, démarrer le pool coûte plus que ça ne rapporte
+MINDIX_SCAN_POLL = 0.05        # secondes entre deux vérifications des délais des tâches en cours
+# une tâche en retard s'arrête d'elle-même (SIGALRM dans le worker) ; le pool n'est tué
+# que si elle ne rend toujours pas la main après ce délai de grâce (bloquée dans du C)
+MINDIX_SCAN_KILL_GRACE = float(os.environ.get("MINDIX_SCAN_KILL_GRACE", 5))
+MINDIX_SCAN_TOKENS = 256       # tâches en vol dans tout le processus, tous appelants confondus
+MINDIX_SCAN_MAX_CRASHES = 2    # pool tombé deux fois avec cette tâche seule en vol : c'est elle
+
+_scan_pool = None
+_scan_pool_pid = None
+_scan_pool_generation = 0
+_recycled_generations = set()  # pools tués exprès : leurs tâches cassées ne sont pas en cause
+_scan_started = None  # heure (monotonic) de début de la tâche de chaque jeton, écrite par le worker
+_scan_free_tokens = []
+_scan_pool_lock = threading.Lock()
+_worker_started = None  # dans un worker du pool : le tableau _scan_started du parent
+
+class ScanOverrun(BaseException):
+    """Levée dans un worker quand sa tâche dépasse son délai (BaseException : aucun `except Exception` ne l'avale)."""
+
+def _init_scan_worker(started_at):
+    global _worker_started
+    _worker_started = started_at
+    signal.signal(signal.SIGTERM, _stop_scan_worker)
+    signal.signal(signal.SIGALRM, _scan_job_overrun)
+
+def _stop_scan_worker(signum, frame):
+    # arrêt du pool : le compilateur en cours (autre session) ne doit pas nous survivre
+    for proc in list(_running_tools):
+        kill_process_group(proc)
+    os._exit(1)
+
+def _scan_job_overrun(signum, frame):
+    raise ScanOverrun()
+
+def scan_job_budget(n_files):
+    return MINDIX_FILE_TIMEOUT + n_files - 1
+
+def get_scan_pool():
+    """
+    (pool, heures de début par jeton, génération), créés à la demande, un par
+    processus (les workers gunicorn ne partagent pas le leur). Le pool est partagé
+    par tous les appelants du processus (threads de jobs, requêtes API).
+    """
+    global _scan_pool, _scan_pool_pid, _scan_started, _scan_free_tokens, _scan_pool_generation
+    with _scan_pool_lock:
+        if _scan_pool_pid != os.getpid():
+            _scan_pool = None
+            _scan_started = MP_CONTEXT.Array("d", MINDIX_SCAN_TOKENS, lock=False)
+            _scan_free_tokens = list(range(MINDIX_SCAN_TOKENS))
+            _scan_pool_pid = os.getpid()
+        if _scan_pool is None:
+            _scan_pool = ProcessPoolExecutor(max_workers=MINDIX_SCAN_WORKERS, mp_context=MP_CONTEXT,
+                                             initializer=_init_scan_worker, initargs=(_scan_started,))
+            _scan_pool_generation += 1
+        return _scan_pool, _scan_started, _scan_pool_generation
+
+def _take_scan_token():
+    with _scan_pool_lock:
+        return _scan_free_tokens.pop() if _scan_free_tokens else None
+
+def _release_scan_token(token):
+    with _scan_pool_lock:
+        _scan_free_tokens.append(token)
+
+def reset_scan_pool(generation=None, kill=False):
+    """
+    Abandonne le pool courant ; kill=True tue aussi ses workers (analyse bloquée).
+    Avec `generation`, ne fait rien si ce pool a déjà été remplacé : un appelant
+    dont les tâches sont tombées avec l'ancien pool ne tue pas le nouveau.
+    """
+    global _scan_pool
+    with _scan_pool_lock:
+        if generation is not None and generation != _scan_pool_generation:
+            return
+        pool, _scan_pool = _scan_pool, None
+        if pool is not None and kill:
+            # noté avant de tuer : les autres appelants verront leurs tâches cassées
+            # comme victimes de ce recyclage, pas comme un plantage
+            _recycled_generations.add(_scan_pool_generation)
+    if pool is None:
+        return
+    # une tâche en cours ne s'annule pas : seul arrêter son worker libère la place (tuer
+    # un seul worker casse de toute façon tout le ProcessPoolExecutor)
+    processes = list((pool._processes or {}).values()) if kill else []
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join(1)
+        if process.is_alive():
+            process.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def scan_timeout_error(filename):
+    return [{
+        "line": 0,
+        "text": filename,
+        "title": TIMEOUT_TITLE,
+        "cause": f"L'analyse de {filename} a dépassé {MINDIX_FILE_TIMEOUT:g} s.",
+        "fix": "Découpe le fichier ou réessaie plus tard.",
+        "severity": 2
+    }]
+
+def scan_crash_error(filename, exc):
+    return [{
+        "line": 0,
+        "text": filename,
+        "title": "💥 Erreur d'analyse",
+        "cause": f"L'analyseur a échoué : {exc}",
+        "fix": "Réessaie ; si le problème persiste, signale le fichier.",
+        "severity": 5
+    }]
+
+def _scan_job(kind, pairs, support=None, token=None, timed=False):
+    """
+    Exécuté dans un worker : [(filename, content)] -> [erreurs], même ordre.
+    Dans un worker du pool, renvoie (erreurs, étapes, règles) : étapes vaut
+    {étape: {"ms", "count"}} avec timed=True (python-parse, tool-*...) et règles
+    les compteurs des règles AST avec MINDIX_RULE_STATS, sinon None ; le parent
+    les fusionne dans les siens.
+    """
+    in_worker = _worker_started is not None
+    if in_worker:
+        if token is not None:
+            _worker_started[token] = time.monotonic()  # le délai court à partir d'ici, pas de la soumission
+        # le worker s'arrête seul à l'échéance : pas besoin de tuer le pool (et les tâches des autres)
+        signal.setitimer(signal.ITIMER_REAL, scan_job_budget(len(pairs)))
+    if timed:
+        begin_stages()
+    try:
+        try:
+            outputs = _run_scan_job(kind, pairs, support)
+        finally:
+            if in_worker:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except ScanOverrun:
+        outputs = [scan_timeout_error(filename) for filename, _ in pairs]
+    finally:
+        if timed:
+            timings, _ = end_stages()
+    if not in_worker:
+        return outputs
+    return (outputs, summarize_stages(timings) if timed else None,
+            pop_rule_stats() if MINDIX_RULE_STATS_ENABLED else None)
+
+def _run_scan_job(kind, pairs, support):
+    if kind == "cc":
+        result = check_c_family_files(pairs, support)
+        if result is not None:
+            return result
+        return [heuristic_checks(content) for _, content in pairs]
+    return [_mindix_scan_content_uncached(content, filename) for filename, content in pairs]
+
+def mindix_scan_many(items, on_file=None, keep=True):
+    """
+    Analyse une liste [(filename, content)] et renvoie la liste des erreurs de
+    chaque fichier, dans l'ordre d'entrée quel que soit l'ordre de fin.
+    Les C/C++ sont regroupés par lots (un appel de compilateur par lot), les
+    autres fichiers partent un par un ; les tâches sont réparties sur le pool
+    de processus avec au plus MINDIX_SCAN_MAX_INFLIGHT tâches en vol.
+    `on_file(i, errors)` est appelé (processus parent) dès qu'un fichier est
+    terminé, dans l'ordre de fin : sert au suivi de progression des jobs.
+    Avec keep=False, les erreurs ne passent que par on_file (rien n'est gardé
+    ici, la liste renvoyée ne contient que des tuples vides).
+    """
+    results = [None] * len(items)
+
+    def complete(i, errors):
+        results[i] = errors if keep else ()
+        if on_file:
+            on_file(i, errors)
+    c_family = {name: content for name, content in items if os.path.splitext(name)[1].lower() in C_FAMILY_EXT}
+
+    # le cache est consulté ici (processus parent) : seuls les vrais manques sont analysés
+    keys, closures, misses = [None] * len(items), {}, []
+    for i, (filename, content) in enumerate(items):
+        ext = os.path.splitext(filename)[1].lower()
+        content_hash = content_sha256(content)
+        if ext in C_FAMILY_EXT:
+            index_key = include_index_key(content_hash)
+            if not scan_cache.contains(index_key):
+                scan_cache.put(index_key, [{"include": inc} for inc in _INCLUDE_RE.findall(content)])
+            closures[i] = resolve_include_closure(filename, c_family)
+            content_hash = c_family_content_hash(content, closures[i], c_family)
+        keys[i] = scan_cache_key(content_hash, ext)
+        errors = scan_cache.get(keys[i])
+        if errors is None:
+            misses.append(i)
+        else:
+            record_scan(filename, "cached")
+            complete(i, errors)
+
+    jobs, cc_groups = [], {}
+    for i in misses:
+        ext = os.path.splitext(items[i][0])[1].lower()
+        if ext in C_FAMILY_EXT:
+            cc_groups.setdefault(c_compiler_for(ext), []).append(i)
+        else:
+            jobs.append(("one", [i]))
+    for group in cc_groups.values():
+        for k in range(0, len(group), MINDIX_CC_BATCH_SIZE):
+            jobs.append(("cc", group[k:k + MINDIX_CC_BATCH_SIZE]))
+
+    def job_args(kind, indices):
+        pairs = [items[i] for i in indices]
+        if kind != "cc":
+            return kind, pairs, None
+        support = {dep: c_family[dep] for i in indices for dep in closures[i]}
+        return kind, pairs, support
+
+    def finish(indices, outputs):
+        for i, errors in zip(indices, outputs):
+            scan_cache.put(keys[i], errors)
+            record_scan(items[i][0], "scanned")
+            complete(i, errors)
+
+    if MINDIX_SCAN_WORKERS <= 1 or len(jobs) < MINDIX_PARALLEL_MIN_FILES:
+        for kind, indices in jobs:
+            finish(indices, _scan_job(*job_args(kind, indices)))
+        return results
+
+    # Chaque tâche soumise prend un jeton (commun au processus) ; le worker y note son
+    # heure de début et s'arrête seul à l'échéance. Une tâche qui ne rend pas la main
+    # après le délai de grâce ne peut pas être interrompue : on tue le pool auquel on
+    # l'a soumise, et les tâches en cours (les nôtres comme celles des autres appelants)
+    # repartent sur un pool neuf. Si le pool casse (worker tué, OOM), les tâches en
+    # cours sont relancées une par une jusqu'à identifier celle qui le fait tomber.
+    todo = deque(range(len(jobs)))
+    suspects, crashes = set(), {}
+    pending = {}  # future -> (n° de tâche, jeton)
+    pool, started_at, generation = get_scan_pool()
+    # les durées par étape sont mesurées dans les workers et fusionnées ici ; les
+    # spans de trace, eux, restent au niveau du parent (étape "scan")
+    timed = getattr(_STAGE_STATE, "timings", None) is not None
+
+    def settle(future):
+        n, token = pending.pop(future)
+        _release_scan_token(token)
+        suspects.discard(n)
+        return n
+
+    def requeue(future, suspect=False):
+        n = settle(future)
+        if crashes.get(n, 0) >= MINDIX_SCAN_MAX_CRASHES:
+            for i in jobs[n][1]:
+                complete(i, scan_crash_error(items[i][0], "le worker d'analyse s'est arrêté"))
+            return
+        if suspect:
+            suspects.add(n)
+        todo.appendleft(n)
+
+    def recycle(broken=False, kill=False):
+        nonlocal pool, started_at, generation
+        # pool tué exprès par un autre appelant : nos tâches n'y sont pour rien
+        crashed = broken and generation not in _recycled_generations
+        if crashed:
+            print("[ERROR] Pool d'analyse cassé, relance sur un pool neuf")
+            if len(pending) == 1:
+                (n, _), = pending.values()
+                crashes[n] = crashes.get(n, 0) + 1
+        for future in list(pending):
+            requeue(future, suspect=crashed)
+        reset_scan_pool(generation, kill=kill)  # sans effet si un autre appelant l'a déjà remplacé
+        pool, started_at, generation = get_scan_pool()
+
+    while todo or pending:
+        broken = False
+        while todo and len(pending) < MINDIX_SCAN_MAX_INFLIGHT and not (suspects and pending):
+            token = _take_scan_token()
+            if token is None:
+                break
+            n = todo.popleft()
+            started_at[token] = 0.0
+            try:
+                future = pool.submit(_scan_job, *job_args(*jobs[n]), token, timed)
+            except (BrokenProcessPool, RuntimeError):  # cassé, ou arrêté par un autre appelant
+                todo.appendleft(n)
+                _release_scan_token(token)
+                broken = True
+                break
+            pending[future] = (n, token)
+        if broken:
+            recycle(broken=True)
+            continue
+        if not pending:
+            time.sleep(MINDIX_SCAN_POLL)  # tous les jetons du processus sont pris
+            continue
+
+        done, _ = wait(pending, timeout=MINDIX_SCAN_POLL, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                outputs = future.result()
+            except BrokenProcessPool:
+                broken = True
+                break
+            except CancelledError:
+                requeue(future)  # pool arrêté par un autre appelant avant le départ de la tâche
+                continue
+            except Exception as e:
+                n = settle(future)
+                for i in jobs[n][1]:
+                    complete(i, scan_crash_error(items[i][0], e))
+                continue
+            n = settle(future)
+            outputs, summary, rule_stats = outputs
+            add_stages(summary)
+            add_rule_stats(rule_stats)
+            try:
+                finish(jobs[n][1], outputs)
+            except Exception as e:
+                for i in jobs[n][1]:
+                    complete(i, scan_crash_error(items[i][0], e))
+        if broken:
+            recycle(broken=True)
+            continue
+
+        now = time.monotonic()
+        overdue = [future for future, (n, token) in pending.items() if started_at[token]
+                   and now - started_at[token] > scan_job_budget(len(jobs[n][1])) + MINDIX_SCAN_KILL_GRACE]
+        if overdue:
+            print(f"[WARN] {len(overdue)} tâche(s) d'analyse bloquée(s) au-delà du délai, pool tué")
+            for future in overdue:
+                n = settle(future)
+                for i in jobs[n][1]:
+                    complete(i, scan_timeout_error(items[i][0]))
+            recycle(kill=True)
+    return results
+
+def mindix_scan_file(filepath: str, filename: str):
+    ext = os.path.splitext(filename)[1].lower()
+    with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+        code = f.read()
+    errors = []
+    if ext == ".py":
+        errors = mindix_scan_all_errors(code, filename)
+    else:
+        errors = heuristic_checks(code)
+    corrected = correct_code_simple(code)
+    return errors, corrected
+
+def correct_code_simple(code: str):
+    corrected = code
+    corrected = re.sub(r'^( *)\t', r'\1    ', corrected, flags=re.MULTILINE)
+    # attempt simple bracket/paren balancing (naïf)
+    if corrected.count('(') > corrected.count(')'):
+        corrected += ')' * (corrected.count('(') - corrected.count(')'))
+    if corrected.count('{') > corrected.count('}'):
+        corrected += '}' * (corrected.count('{') - corrected.count('}'))
+    for mark in ('"', "'"):
+        if corrected.count(mark) % 2 != 0:
+            corrected += mark
+    return corrected
+
+# ----------------------------
+# Classification avant analyse : quelques Ko du début suffisent pour écarter
+# les binaires (NUL, caractères de contrôle) et les fichiers minifiés (lignes
+# géantes), et choisir l'encodage (BOM, UTF-8 valide, sinon latin-1). Le
+# contenu n'est ensuite décodé qu'une fois, avec cet encodage.
+# ----------------------------
+SNIFF_BYTES = 8 * 1024
+MINIFIED_MAX_LINE = 2000         # une ligne plus longue dans l'échantillon...
+MINIFIED_AVG_LINE = 300          # ...et une moyenne au-dessus : fichier minifié / généré
+BINARY_CONTROL_RATIO = 0.10      # part de caractères de contrôle au-delà de laquelle c'est du binaire
+# les BOM UTF-32 avant UTF-16 (FF FE est le début des deux)
+TEXT_BOMS = ((codecs.BOM_UTF32_LE, "utf-32"), (codecs.BOM_UTF32_BE, "utf-32"), (codecs.BOM_UTF8, "utf-8-sig"),
+             (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+_CONTROL_BYTES = bytes(b for b in range(32) if b not in b"\t\n\r\f\x1b")
+
+def classify_source(raw: bytes, path: str = ""):
+    """(type, encodage) : type "text", "binary" ou "minified" ; encodage utilisable avec bytes.decode."""
+    head = raw[:SNIFF_BYTES]
+    for bom, encoding in TEXT_BOMS:
+        if head.startswith(bom):
+            return "text", encoding
+    if b"\0" in head:
+        return "binary", None
+    if head and len(head) - len(head.translate(None, _CONTROL_BYTES)) > len(head) * BINARY_CONTROL_RATIO:
+        return "binary", None
+
+    if path.lower().endswith((".min.js", ".bundle.js")):
+        return "minified", None
+    lines = head.split(b"\n")
+    if len(raw) > SNIFF_BYTES:
+        lines.pop()  # dernière ligne coupée par l'échantillon
+    longest = max((len(line) for line in lines), default=len(head))
+    if not lines or longest > MINIFIED_MAX_LINE and len(head) / len(lines) > MINIFIED_AVG_LINE:
+        return "minified", None
+
+    try:
+        # décodeur incrémental : un caractère multi-octets coupé en fin d'échantillon n'est pas une erreur
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=len(raw) <= SNIFF_BYTES)
+        return "text", "utf-8"
+    except UnicodeDecodeError:
+        return "text", "latin-1"
+
+SKIP_REASONS = {"binary": "fichier binaire", "minified": "fichier minifié ou généré"}
+
+def decode_sources(raw_members):
+    """[(chemin, octets)] -> ([(chemin, texte)], [(chemin, raison)] ignorés), chaque contenu décodé une fois."""
+    members, skipped = [], []
+    for path, raw in raw_members:
+        kind, encoding = classify_source(raw, path)
+        if kind != "text":
+            skipped.append((path, SKIP_REASONS[kind]))
+            continue
+        members.append((path, raw.decode(encoding, errors="replace")))
+    return members, skipped
+
+# ----------------------------
+# Archives lues en mémoire, membre par membre (rien n'est extrait sur disque).
+# Limites par membre et totale sur la taille décompressée (zip bombs) ; les
+# membres qui ne sont pas du code source ne sont jamais décompressés (zip).
+# ----------------------------
+MINDIX_MAX_MEMBER_BYTES = int(os.environ.get("MINDIX_MAX_MEMBER_BYTES", 2 * 1024 * 1024))
+MINDIX_MAX_ARCHIVE_BYTES = int(os.environ.get("MINDIX_MAX_ARCHIVE_BYTES", 50 * 1024 * 1024))
+ARCHIVE_READ_CHUNK = 64 * 1024
+
+class ArchiveLimitError(Exception):
+    pass
+
+class InvalidArchiveError(Exception):
+    pass
+
+def _read_limited(stream, limit: int):
+    """Lit au plus `limit` octets ; None si le membre est plus gros (taille d'en-tête non fiable)."""
+    chunks, size = [], 0
+    while True:
+        chunk = stream.read(ARCHIVE_READ_CHUNK)
+        if not chunk:
+            return b"".join(chunks)
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+
+def _iter_raw_members(data, filename: str):
+    """
+    (nom, taille annoncée, ouverture paresseuse) pour chaque fichier régulier de
+    l'archive : `data` en octets ou fichier binaire ouvert (positionnable).
+    """
+    buf = BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
+    if zipfile.is_zipfile(buf):
+        with zipfile.ZipFile(buf) as zf:
+            for info in zf.infolist():
+                if not info.is_dir():
+                    yield info.filename, info.file_size, functools.partial(zf.open, info)
+        return
+    buf.seek(0)
+    try:
+        # mode flux "r|*" : lecture séquentielle, sans retour arrière dans le flux compressé
+        with tarfile.open(fileobj=buf, mode="r|*") as tar:
+            for member in tar:
+                if member.isfile():
+                    yield member.name, member.size, functools.partial(tar.extractfile, member)
+        return
+    except tarfile.ReadError:
+        pass
+    # .gz qui n'est pas un tar : un seul fichier compressé (ex: main.py.gz)
+    if filename.lower().endswith(".gz"):
+        buf.seek(0)
+        yield filename[:-3], 0, functools.partial(gzip.GzipFile, fileobj=buf)
+        return
+    raise ValueError("format d'archive non reconnu")
+
+def read_archive_sources(data: bytes, filename: str):
+    """
+    Membres source d'une archive : ([(chemin relatif, octets)], [(chemin, raison)] ignorés).
+    Lève ArchiveLimitError si le total décompressé dépasse MINDIX_MAX_ARCHIVE_BYTES,
+    ValueError / zipfile.BadZipFile / tarfile.TarError / OSError si l'archive est invalide.
+    """
+    members, skipped, total = [], [], 0
+    for name, declared_size, opener in _iter_raw_members(data, filename):
+        path = safe_member_path(name)
+        if path is None or os.path.splitext(path)[1].lower() not in AI_ALLOWED_SINGLE:
+            continue  # jamais décompressé (zip) / sauté dans le flux (tar)
+        if declared_size > MINDIX_MAX_MEMBER_BYTES:
+            skipped.append((path, member_too_large_reason()))
+            continue
+        with opener() as stream:
+            raw = _read_limited(stream, MINDIX_MAX_MEMBER_BYTES)
+        if raw is None:
+            skipped.append((path, member_too_large_reason()))
+            continue
+        total += len(raw)
+        if total > MINDIX_MAX_ARCHIVE_BYTES:
+            raise ArchiveLimitError(f"Archive trop volumineuse une fois décompressée (> {MINDIX_MAX_ARCHIVE_BYTES // (1024 * 1024)} Mo).")
+        members.append((path, raw))
+    return members, skipped
+
+def member_too_large_reason():
+    return f"trop volumineux (limite {MINDIX_MAX_MEMBER_BYTES // 1024} Ko par fichier)"
+
+def skipped_member_error(path: str, reason: str):
+    return {
+        "line": 0,
+        "text": path,
+        "title": "📦 Fichier ignoré",
+        "cause": f"{path} : {reason}.",
+        "fix": "Seuls les sources texte lisibles (ni binaires, ni minifiés) de taille raisonnable sont analysés.",
+        "severity": 5
+    }
+
+# ----------------------------
+# Archive corrigée produite à la volée : correct_code_simple est appliqué à
+# chaque membre source, les autres membres sont recopiés tels quels, et le zip
+# est écrit dans un tampon vidé vers le client après chaque écriture (ZipFile
+# sur un flux non positionnable : descripteurs de données, pas de retour
+# arrière). Ni zip temporaire, ni archive complète en mémoire.
+# ----------------------------
+MINDIX_ZIP_LEVEL = int(os.environ.get("MINDIX_ZIP_LEVEL", 6))   # 0 = stocké sans compression, 1..9 = deflate
+
+class ZipStreamBuffer(io.RawIOBase):
+    """Sortie non positionnable de ZipFile : accumule les octets écrits jusqu'au prochain drain()."""
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def corrected_member_bytes(raw: bytes):
+    """Contenu corrigé d'un membre source ; inchangé s'il n'est pas en UTF-8 valide."""
+    try:
+        code = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw
+    corrected = correct_code_simple(code)
+    return raw if corrected == code else corrected.encode("utf-8")
+
+def iter_corrected_zip(data, filename: str, level=MINDIX_ZIP_LEVEL):
+    """
+    Morceaux successifs d'un zip contenant les membres de l'archive `data` (octets
+    ou fichier ouvert, lu au fil de l'eau), sources corrigées. Lève ArchiveLimitError en cours de route si le total
+    décompressé dépasse MINDIX_MAX_ARCHIVE_BYTES (le flux est alors tronqué).
+    """
+    out = ZipStreamBuffer()
+    compression = zipfile.ZIP_STORED if level == 0 else zipfile.ZIP_DEFLATED
+    total = 0
+    with zipfile.ZipFile(out, "w", compression=compression, compresslevel=level or None) as zf:
+        for name, declared_size, opener in _iter_raw_members(data, filename):
+            path = safe_member_path(name)
+            if path is None:
+                continue
+            is_source = os.path.splitext(path)[1].lower() in AI_ALLOWED_SINGLE
+            info = zipfile.ZipInfo(path, date_time=time.localtime()[:6])
+            info.compress_type = compression
+            with opener() as stream, zf.open(info, "w", force_zip64=True) as member:
+                if is_source and declared_size <= MINDIX_MAX_MEMBER_BYTES:
+                    chunk = stream.read(MINDIX_MAX_MEMBER_BYTES + 1)
+                    if len(chunk) <= MINDIX_MAX_MEMBER_BYTES:  # sinon taille annoncée fausse : recopié tel quel
+                        chunk = corrected_member_bytes(chunk)
+                else:
+                    chunk = stream.read(ARCHIVE_READ_CHUNK)
+                while chunk:
+                    total += len(chunk)
+                    if total > MINDIX_MAX_ARCHIVE_BYTES:
+                        raise ArchiveLimitError(f"Archive trop volumineuse une fois décompressée (> {MINDIX_MAX_ARCHIVE_BYTES // (1024 * 1024)} Mo).")
+                    member.write(chunk)
+                    written = out.drain()
+                    if written:
+                        yield written
+                    chunk = stream.read(ARCHIVE_READ_CHUNK)
+    yield out.drain()  # fin des membres + répertoire central
+
+def corrected_download_name(filename: str):
+    base = os.path.basename(filename)
+    for ext in (".tar.gz", ".tgz", ".tar", ".zip", ".gz"):
+        if base.lower().endswith(ext):
+            return base[:-len(ext)] + "_corrige.zip"
+    stem, ext = os.path.splitext(base)
+    return f"{stem}_corrige{ext}"
+
+# ----------------------------
+# Compression des réponses & cache des pages statiques
+# ----------------------------
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))  # octets, en dessous on n'y touche pas
+COMPRESS_GZIP_LEVEL = 6
+COMPRESS_BROTLI_LEVEL = 5          # à la volée : compromis vitesse / taille
+STATIC_PAGE_BROTLI_LEVEL = 11      # pré-calculé une seule fois : on peut viser le max
+COMPRESSIBLE_MIMETYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+# (template, contexte) -> {"identity": bytes, "gzip": bytes, "br": bytes, "etag": str}
+_STATIC_PAGE_CACHE = {}
+
+def negotiate_encoding(accept_encoding):
+    """Choisit 'br', 'gzip' ou None d'après l'en-tête Accept-Encoding (q-values comprises)."""
+    prefs = {}
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        prefs[token] = q
+
+    best, best_q = None, 0.0
+    for enc in (("br",) if brotli else ()) + ("gzip",):
+        q = prefs.get(enc, prefs.get("*", 0.0))
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+@timed_stage("compress")
+def compress_body(data: bytes, encoding: str, level=None):
+    if encoding == "br":
+        return brotli.compress(data, quality=COMPRESS_BROTLI_LEVEL if level is None else level)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL if level is None else level)
+
+def render_static_page(template_name, status=200, **context):
+    """
+    Rend un template "statique" une seule fois par contexte et garde en mémoire
+    ses variantes gzip / brotli pré-calculées. La variante servie dépend de
+    l'Accept-Encoding du client.
+    """
+    key = (template_name, tuple(sorted(context.items())))
+    entry = _STATIC_PAGE_CACHE.get(key)
+    if entry is None or app.debug:
+        body = render_template(template_name, **context).encode("utf-8")
+        entry = {
+            "identity": body,
+            "gzip": compress_body(body, "gzip", level=9),
+            "etag": hashlib.sha1(body).hexdigest(),
+        }
+        if brotli:
+            entry["br"] = compress_body(body, "br", level=STATIC_PAGE_BROTLI_LEVEL)
+        _STATIC_PAGE_CACHE[key] = entry
+
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+    resp = app.response_class(entry[encoding or "identity"], status=status, mimetype="text/html")
+    if encoding:
+        resp.headers["Content-Encoding"] = encoding
+    resp.vary.add("Accept-Encoding")
+    if status == 200:
+        # ETag distinct par variante : un cache ne doit pas confondre gzip et brotli
+        resp.set_etag(f"{entry['etag']}-{encoding or 'identity'}")
+        resp.make_conditional(request)
+    return resp
+
+@app.after_request
+def compress_response(response):
+    """Compression à la volée des réponses dynamiques au-dessus de COMPRESS_MIN_SIZE."""
+    mimetype = response.mimetype or ""
+    if not mimetype.startswith(COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add("Accept-Encoding")
+    if (response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or not 200 <= response.status_code < 300 or response.status_code == 204):
+        return response
+
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+    if not encoding:
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    response.set_data(compress_body(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+# ----------------------------
+# Assets empreintés (voir build_assets.py)
+# ----------------------------
+ASSET_MANIFEST_FILE = os.path.join(BASE_DIR, "static", "dist", "manifest.json")
+ASSET_MAX_AGE = 365 * 24 * 3600  # nom = contenu, on peut cacher "pour toujours"
+# ordre de préférence des <source> : le navigateur prend la première qu'il sait décoder
+ASSET_MODERN_FORMATS = ("avif", "webp")
+
+def load_asset_manifest():
+    if not os.path.exists(ASSET_MANIFEST_FILE):
+        return {"files": {}, "images": {}}
+    with open(ASSET_MANIFEST_FILE, "r", encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except Exception:
+            return {"files": {}, "images": {}}
+
+_ASSET_MANIFEST = load_asset_manifest()
+
+@app.template_global()
+def asset_url(filename):
+    """URL empreintée d'un fichier de static/ (ou l'URL classique si le build n'a pas tourné)."""
+    return url_for('static', filename=_ASSET_MANIFEST["files"].get(filename, filename))
+
+@app.template_global()
+def asset_img(filename, alt="", sizes="100vw", **attrs):
+    """
+    Balise <picture> avec srcset AVIF/WebP/format d'origine pour une image de static/.
+    `sizes` doit refléter la largeur affichée (ex: "40px" pour le logo de la navbar).
+    """
+    info = _ASSET_MANIFEST["images"].get(filename)
+    attrs.setdefault("loading", "lazy")
+    attrs.setdefault("decoding", "async")
+    if info:
+        attrs.setdefault("width", info["width"])
+        attrs.setdefault("height", info["height"])
+    extra = "".join(f' {k.rstrip("_").replace("_", "-")}="{escape(v)}"' for k, v in attrs.items() if v is not None)
+    img_tag = f'<img src="{escape(asset_url(filename))}" alt="{escape(alt)}"{extra}'
+    if not info or not info["variants"]:
+        return Markup(img_tag + ">")
+
+    def srcset(fmt):
+        return ", ".join(f'{url_for("static", filename=v["path"])} {v["width"]}w'
+                         for v in info["variants"] if v["format"] == fmt)
+
+    sources = "".join(f'<source type="image/{fmt}" srcset="{escape(srcset(fmt))}" sizes="{escape(sizes)}">'
+                      for fmt in ASSET_MODERN_FORMATS if srcset(fmt))
+    orig_fmt = "png" if filename.lower().endswith(".png") else "jpeg"
+    orig_srcset = srcset(orig_fmt)
+    orig_srcset = f"{orig_srcset}, {asset_url(filename)} {info['width']}w" if orig_srcset else f"{asset_url(filename)} {info['width']}w"
+    return Markup(f'<picture>{sources}{img_tag} srcset="{escape(orig_srcset)}" sizes="{escape(sizes)}"></picture>')
+
+@app.after_request
+def immutable_asset_cache(response):
+    if request.path.startswith("/static/dist/") and response.status_code == 200:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = ASSET_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+# ----------------------------
+# Routes principales (pages)
+# ----------------------------
+@app.route('/')
+def root():
+    return redirect(url_for('home'))
+
+@app.route("/home")
+def home():
+    return render_static_page("home.html", logged_in='username' in session)
+
+@app.route('/socialmedia')
+def socialmedia():
+    return render_static_page("social.html")
+
+
+@app.route('/project')
+def project():
+    admin_ips = load_admin_ips()
     user_ip = request.remote_addr
     is_admin = user_ip in admin_ips
     projects = load_projects()
@@ -383,12 +2778,13 @@ def add_project():
     if not project_name or not github_link:
         return jsonify({"error": "Nom ou lien manquant"}), 400
 
-    projects = load_projects()
-    if project_name in projects:
-        return jsonify({"error": "Ce projet existe déjà"}), 400
+    with data_file_lock(PROJECT_FILE):
+        projects = load_projects()
+        if project_name in projects:
+            return jsonify({"error": "Ce projet existe déjà"}), 400
 
-    projects[project_name] = github_link
-    save_projects(projects)
+        projects[project_name] = github_link
+        save_projects(projects)
     return jsonify({"success": True, "url": github_link})
 
 @app.route('/delete_project', methods=['POST'])
@@ -403,12 +2799,13 @@ def delete_project():
     if not project_name:
         return jsonify({"error": "Nom invalide"}), 400
 
-    projects = load_projects()
-    if project_name not in projects:
-        return jsonify({"error": "Ce projet n'existe pas"}), 404
+    with data_file_lock(PROJECT_FILE):
+        projects = load_projects()
+        if project_name not in projects:
+            return jsonify({"error": "Ce projet n'existe pas"}), 404
 
-    del projects[project_name]
-    save_projects(projects)
+        del projects[project_name]
+        save_projects(projects)
     return jsonify({"success": True})
 
 @app.route('/nova-life')
@@ -418,11 +2815,17 @@ def nova():
     user_ip = request.headers.get('X-Forwarded-For', request.remote_addr)
     is_admin = user_ip in admin_ips
     projects = load_nova_projects()
-    return render_template('nova.html', is_admin=is_admin, projects=projects)
+    meta = {}
+    if repo_metadata_cache is not None:
+        repo_metadata_cache.start_refresher(
+            lambda: {name: info.get("link") for name, info in load_nova_projects().items()})
+        meta = repo_metadata_cache.get_many({name: info.get("link") for name, info in projects.items()})
+    return render_template('nova.html', is_admin=is_admin, projects=projects, meta=meta)
 
 @app.errorhandler(404)
 def page_not_found(e):
-    return render_template('404.html'), 404
+    # couvre aussi /soon, qui n'a pas encore de page dédiée
+    return render_static_page('404.html', status=404)
 
 from flask import send_from_directory
 
@@ -431,6 +2834,890 @@ def favicon():
     return send_from_directory(os.path.join(BASE_DIR, 'ressources'),
                                'icon.ico', mimetype='image/vnd.microsoft.icon')
 # ----------------------------
+# Import / export NDJSON des catalogues de projets (admin)
+# - GET  /projects/export?catalog=projects|nova          -> une ligne JSON par projet
+# - POST /projects/import?catalog=...&mode=merge|replace  -> corps NDJSON, une seule écriture
+#        &dry_run=1      : valide sans rien écrire
+#        &skip_invalid=1 : applique les lignes valides même s'il y a des erreurs
+# ----------------------------
+NDJSON_MIMETYPE = "application/x-ndjson"
+IMPORT_MAX_LINE_BYTES = 64 * 1024
+IMPORT_MAX_REPORTED_ERRORS = 200
+
+def _validate_link(value):
+    if not isinstance(value, str) or not value.strip():
+        return "champ 'link' manquant"
+    if not value.strip().startswith(("http://", "https://")):
+        return "'link' doit être une URL http(s)"
+    return None
+
+def validate_project_record(record):
+    """projects.json : {"name": ..., "link": ...} -> (nom, valeur) ou message d'erreur."""
+    error = _validate_link(record.get("link"))
+    if error:
+        return None, error
+    return record["link"].strip(), None
+
+def validate_nova_record(record):
+    """nova_projects.json : {"name", "link", "description"?, "tags"?}."""
+    error = _validate_link(record.get("link"))
+    if error:
+        return None, error
+    description = record.get("description", "")
+    if not isinstance(description, str):
+        return None, "'description' doit être une chaîne"
+    tags = record.get("tags", [])
+    if isinstance(tags, str):
+        tags = [t.strip() for t in tags.split(",") if t.strip()]
+    if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+        return None, "'tags' doit être une liste de chaînes"
+    return {"link": record["link"].strip(), "description": description, "tags": tags}, None
+
+# nom -> (fichier, chargement, sauvegarde, validation, sérialisation d'une entrée)
+PROJECT_CATALOGS = {
+    "projects": (PROJECT_FILE, load_projects, save_projects, validate_project_record,
+                 lambda name, link: {"name": name, "link": link}),
+    "nova": (NOVA_FILE, load_nova_projects, save_nova_projects, validate_nova_record,
+             lambda name, info: {"name": name, **info}),
+}
+
+def iter_import_lines(stream, limit=IMPORT_MAX_LINE_BYTES):
+    """
+    Lignes du corps, lues par readline(limit + 1) : une ligne trop longue donne None
+    et sa suite est jetée au fil de la lecture, sans jamais tenir plus de `limit` octets.
+    """
+    while True:
+        raw = stream.readline(limit + 1)
+        if not raw:
+            return
+        if len(raw) > limit and not raw.endswith(b"\n"):
+            while raw and not raw.endswith(b"\n"):
+                raw = stream.readline(limit + 1)
+            yield None
+        else:
+            yield raw
+
+def parse_import_line(raw, validator):
+    """Retourne (op, nom, valeur, erreur) pour une ligne NDJSON."""
+    if len(raw) > IMPORT_MAX_LINE_BYTES:
+        return None, None, None, f"ligne trop longue (> {IMPORT_MAX_LINE_BYTES} octets)"
+    try:
+        record = json.loads(raw)
+    except ValueError as e:
+        return None, None, None, f"JSON invalide : {e}"
+    if not isinstance(record, dict):
+        return None, None, None, "chaque ligne doit être un objet JSON"
+    name = record.get("name")
+    if not isinstance(name, str) or not name.strip():
+        return None, None, None, "champ 'name' manquant"
+    if record.get("delete") is True:
+        return "delete", name.strip(), None, None
+    value, error = validator(record)
+    if error:
+        return None, None, None, error
+    return "upsert", name.strip(), value, None
+
+@app.route('/projects/export', methods=['GET'])
+def projects_export():
+    if request.remote_addr not in load_admin_ips():
+        return jsonify({"error": "Accès refusé"}), 403
+    catalog = request.args.get("catalog", "projects")
+    if catalog not in PROJECT_CATALOGS:
+        return jsonify({"error": "catalog doit être 'projects' ou 'nova'"}), 400
+    _, load, _, _, serialize = PROJECT_CATALOGS[catalog]
+    projects = load()
+
+    def generate():
+        for name, value in projects.items():
+            yield json.dumps(serialize(name, value), ensure_ascii=False) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE,
+                    headers={"Content-Disposition": f"attachment; filename={catalog}.ndjson"})
+
+@app.route('/projects/import', methods=['POST'])
+def projects_import():
+    if request.remote_addr not in load_admin_ips():
+        return jsonify({"error": "Accès refusé"}), 403
+    catalog = request.args.get("catalog", "projects")
+    if catalog not in PROJECT_CATALOGS:
+        return jsonify({"error": "catalog doit être 'projects' ou 'nova'"}), 400
+    mode = request.args.get("mode", "merge")
+    if mode not in ("merge", "replace"):
+        return jsonify({"error": "mode doit être 'merge' ou 'replace'"}), 400
+    dry_run = request.args.get("dry_run") == "1"
+    skip_invalid = request.args.get("skip_invalid") == "1"
+    path, load, save, validator, _ = PROJECT_CATALOGS[catalog]
+
+    # 1) lecture en flux : on ne garde que les opérations validées, pas le corps brut
+    operations, errors, error_count, line_count = [], [], 0, 0
+    for lineno, raw in enumerate(iter_import_lines(request.stream), 1):
+        if raw is not None:
+            raw = raw.strip()
+            if not raw:
+                continue
+        line_count += 1
+        if raw is None:
+            op, name, value, error = None, None, None, f"ligne trop longue (> {IMPORT_MAX_LINE_BYTES} octets)"
+        else:
+            op, name, value, error = parse_import_line(raw, validator)
+        if error:
+            error_count += 1
+            if len(errors) < IMPORT_MAX_REPORTED_ERRORS:
+                errors.append({"line": lineno, "error": error})
+            continue
+        operations.append((op, name, value))
+
+    report = {"catalog": catalog, "mode": mode, "lines": line_count,
+              "valid": len(operations), "error_count": error_count, "errors": errors,
+              "created": 0, "updated": 0, "deleted": 0, "written": False}
+    if error_count and not skip_invalid:
+        return jsonify({"success": False, **report}), 422
+
+    # 2) application en mémoire puis une seule écriture atomique
+    with data_file_lock(path):
+        current = load()
+        projects = {} if mode == "replace" else dict(current)
+        for op, name, value in operations:
+            if op == "delete":
+                if projects.pop(name, None) is not None:
+                    report["deleted"] += 1
+            else:
+                report["updated" if name in projects else "created"] += 1
+                projects[name] = value
+        if mode == "replace":
+            report["deleted"] += len(set(current) - set(projects))
+            report["updated"] = sum(1 for n in projects if n in current)
+            report["created"] = len(projects) - report["updated"]
+        if not dry_run:
+            save(projects)
+            report["written"] = True
+    return jsonify({"success": True, **report})
+
+# ----------------------------
+# Collecte des diagnostics à mémoire bornée : une archive pathologique peut en
+# produire des millions. Chaque diagnostic devient un objet à __slots__ dont
+# les chaînes répétées (fichier, titre, cause, correctif) sont internées ;
+# doublons éliminés sur toute l'analyse ; au plus N par fichier, et au plus
+# MINDIX_MAX_DIAGNOSTICS au total en gardant les plus graves (tas des K
+# meilleurs). Tout ce qui est écarté est compté.
+# ----------------------------
+MINDIX_MAX_DIAGNOSTICS = int(os.environ.get("MINDIX_MAX_DIAGNOSTICS", 5000))
+MINDIX_MAX_DIAGNOSTICS_PER_FILE = int(os.environ.get("MINDIX_MAX_DIAGNOSTICS_PER_FILE", 200))
+
+class Diagnostic:
+    __slots__ = ("file", "line", "col", "text", "title", "cause", "fix", "severity", "order")
+
+    def __init__(self, file, error, order):
+        self.file = sys.intern(str(file))
+        self.line = error.get("line", 0)
+        self.col = error.get("col")
+        self.text = str(error.get("text", ""))
+        self.title = sys.intern(str(error.get("title", "")))
+        self.cause = sys.intern(str(error.get("cause", "")))
+        self.fix = sys.intern(str(error.get("fix", "")))
+        try:
+            self.severity = int(error.get("severity", 5))
+        except (TypeError, ValueError):
+            self.severity = 5
+        self.order = order
+
+    def key(self):
+        return (self.file, self.line, self.col, self.title, self.text)
+
+    def as_dict(self):
+        d = {"file": self.file, "line": self.line, "text": self.text, "title": self.title,
+             "cause": self.cause, "fix": self.fix, "severity": self.severity}
+        if self.col is not None:
+            d["col"] = self.col
+        return d
+
+class DiagnosticStore:
+    def __init__(self, max_total=MINDIX_MAX_DIAGNOSTICS, max_per_file=MINDIX_MAX_DIAGNOSTICS_PER_FILE):
+        self.max_total = max_total
+        self.max_per_file = max_per_file
+        # tas min sur (-sévérité, -ordre) : la racine est le moins grave, et le plus récent à gravité égale
+        self._heap = []
+        self._keys = {}          # clé -> Diagnostic conservé (dédoublonnage)
+        self._kept_per_file = {}
+        self._file_rank = {}     # fichier -> ordre d'arrivée, pour restituer les groupes
+        self._order = 0
+        self.seen = 0
+        self.duplicates = 0
+        self.suppressed_global = 0
+        self.suppressed_per_file = {}
+
+    def add(self, file, errors):
+        """Ajoute les erreurs d'un fichier ; renvoie (en dicts) celles qui sont retenues."""
+        self._file_rank.setdefault(file, len(self._file_rank))
+        kept = []
+        for error in errors:
+            self.seen += 1
+            diag = Diagnostic(file, error, self._order)
+            self._order += 1
+            key = diag.key()
+            if key in self._keys:
+                self.duplicates += 1
+                continue
+            if self._kept_per_file.get(file, 0) >= self.max_per_file:
+                self.suppressed_per_file[file] = self.suppressed_per_file.get(file, 0) + 1
+                continue
+            entry = (-diag.severity, -diag.order, diag)
+            if len(self._heap) >= self.max_total:
+                dropped = heapq.heappushpop(self._heap, entry)[2]
+                self.suppressed_global += 1
+                if dropped is diag:
+                    continue
+                del self._keys[dropped.key()]
+                self._kept_per_file[dropped.file] -= 1
+            else:
+                heapq.heappush(self._heap, entry)
+            self._keys[key] = diag
+            self._kept_per_file[file] = self._kept_per_file.get(file, 0) + 1
+            kept.append(diag.as_dict())
+        return kept
+
+    def diagnostics(self):
+        """Diagnostics conservés, groupés par fichier (ordre d'arrivée) puis dans l'ordre du scanner."""
+        diags = sorted((entry[2] for entry in self._heap), key=lambda d: (self._file_rank[d.file], d.order))
+        return [d.as_dict() for d in diags]
+
+    def suppressed(self, file=None):
+        if file is not None:
+            return self.suppressed_per_file.get(file, 0)
+        return self.suppressed_global + sum(self.suppressed_per_file.values())
+
+    def summary(self):
+        return {"seen": self.seen, "kept": len(self._heap), "duplicates": self.duplicates,
+                "suppressed": self.suppressed(), "max_total": self.max_total, "max_per_file": self.max_per_file}
+
+# ----------------------------
+# Jobs MINDIX asynchrones : la requête HTTP enregistre le fichier et rend un
+# identifiant tout de suite, l'analyse tourne sur un pool de threads (qui
+# délègue lui-même au pool de processus). L'état est sur disque, un dossier
+# par job, pour être lisible depuis n'importe quel worker gunicorn :
+#   <id>/job.json     {"status": queued|running|done|error, "done", "total", ...}
+#   <id>/result.json  {"errors": [...], "upload_msg": "..."}
+#   <id>/upload.bin   fichier envoyé, relu pour le téléchargement corrigé
+#   <id>/events.ndjson  un événement par ligne, relu en Server-Sent Events :
+#       {"type": "total"} puis {"type": "file", "file", "errors"} par fichier
+#       terminé, et pour finir {"type": "done"} ou {"type": "failed"}
+# ----------------------------
+MINDIX_JOBS_DIR = os.environ.get("MINDIX_JOBS_DIR", os.path.join(tempfile.gettempdir(), "mindix_jobs"))
+MINDIX_JOB_WORKERS = int(os.environ.get("MINDIX_JOB_WORKERS", 2))
+MINDIX_JOB_TTL = int(os.environ.get("MINDIX_JOB_TTL", 3600))   # secondes de conservation après la fin
+MINDIX_JOB_PROGRESS_INTERVAL = 0.5   # écriture de job.json au plus toutes les N secondes
+MINDIX_SSE_POLL_INTERVAL = 0.2
+MINDIX_SSE_HEARTBEAT = 15            # commentaire SSE envoyé si rien d'autre, pour les proxys
+# flux court : au-delà il se ferme et le navigateur se reconnecte MINDIX_SSE_RETRY_MS plus
+# tard (Last-Event-ID). Un onglet ouvert ne garde donc jamais un worker / thread pour lui
+MINDIX_SSE_MAX_SECONDS = float(os.environ.get("MINDIX_SSE_MAX_SECONDS", 5))
+MINDIX_SSE_RETRY_MS = 1000
+JOB_TERMINAL_EVENTS = ("done", "failed")
+_JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+_job_executor = None
+_job_executor_pid = None
+_job_executor_lock = threading.Lock()
+_last_job_purge = 0.0
+_HOSTNAME = socket.gethostname()
+
+def get_job_executor():
+    global _job_executor, _job_executor_pid
+    with _job_executor_lock:
+        if _job_executor is None or _job_executor_pid != os.getpid():
+            _job_executor = ThreadPoolExecutor(max_workers=MINDIX_JOB_WORKERS, thread_name_prefix="mindix-job")
+            _job_executor_pid = os.getpid()
+        return _job_executor
+
+def job_path(job_id, name="job.json"):
+    if not _JOB_ID_RE.match(job_id or ""):
+        return None
+    return os.path.join(MINDIX_JOBS_DIR, job_id, name)
+
+def _process_start_time(pid):
+    """Date de démarrage du processus (/proc, en ticks depuis le boot) : distingue un pid réutilisé."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    return int(stat.rsplit(b")", 1)[1].split()[19])
+
+def job_owner():
+    """Processus qui exécute les jobs qu'il soumet (l'exécuteur est local au worker web)."""
+    pid = os.getpid()
+    return {"host": _HOSTNAME, "pid": pid, "start": _process_start_time(pid)}
+
+def job_owner_alive(owner):
+    if not owner:
+        return False  # job d'avant l'enregistrement du propriétaire : forcément d'avant un redémarrage
+    if owner.get("host") != _HOSTNAME:
+        return True   # invérifiable d'ici
+    if owner.get("start") is not None:
+        return _process_start_time(owner["pid"]) == owner["start"]
+    try:
+        os.kill(owner["pid"], 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def read_job(job_id):
+    """
+    État du job, ou None s'il n'existe pas (ou plus). Un job en attente ou en cours
+    dont le processus propriétaire est mort est rendu en erreur.
+    """
+    path = job_path(job_id)
+    if path is None:
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            job = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if job["status"] in ("queued", "running") and not job_owner_alive(job.get("owner")):
+        job.update(status="error", error="Analyse interrompue (serveur redémarré), relance-la.")
+    return job
+
+def write_job(job_id, job):
+    job["updated"] = time.time()
+    write_json_atomic(job_path(job_id), job)
+
+def read_job_result(job_id):
+    path = job_path(job_id, "result.json")
+    if path is None:
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def purge_expired_jobs(force=False):
+    """Supprime les jobs terminés depuis plus de MINDIX_JOB_TTL (au plus une passe par minute)."""
+    global _last_job_purge
+    now = time.time()
+    if not force and now - _last_job_purge < 60:
+        return 0
+    _last_job_purge = now
+    removed = 0
+    try:
+        job_ids = os.listdir(MINDIX_JOBS_DIR)
+    except OSError:
+        return 0
+    for job_id in job_ids:
+        job_dir = os.path.join(MINDIX_JOBS_DIR, job_id)
+        job = read_job(job_id)
+        try:
+            if job is None:
+                last = os.path.getmtime(job_dir)  # job.json pas encore écrit, ou débris
+            elif job["status"] in ("done", "error"):
+                last = job.get("finished") or job["updated"]
+            else:
+                continue
+        except OSError:
+            continue
+        if now - last > MINDIX_JOB_TTL:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            removed += 1
+    return removed
+
+def check_upload_name(filename):
+    """Message d'erreur si le nom de fichier envoyé n'est pas analysable, sinon None."""
+    if not filename:
+        return "Nom de fichier vide"
+    if os.path.splitext(filename)[1].lower() not in ALLOWED_EXT:
+        return "Formats acceptés : .py, .js, .cs, .c, .cpp, .h, .hpp, .zip, .tar, .gz"
+    return None
+
+def mindix_analyze_upload(filename, content_bytes, on_total=None, on_file=None):
+    """
+    Diagnostics MINDIX d'un fichier envoyé (source seul ou archive), dans un
+    DiagnosticStore ; chaque diagnostic a la clé "file" (chemin dans l'archive).
+    `on_total(n)` reçoit le nombre de fichiers de l'archive, `on_file(chemin, erreurs)`
+    est appelé pour chacun (erreurs retenues) dès qu'il est analysé ou ignoré.
+    Lève ArchiveLimitError / InvalidArchiveError si l'archive est refusée ou illisible.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    notify_total = on_total or (lambda total: None)
+    store = DiagnosticStore()
+
+    def add(path, errors):
+        kept = store.add(path, errors)
+        if on_file:
+            on_file(path, kept)
+
+    if ext in AI_ALLOWED_SINGLE:
+        notify_total(1)
+        with stage("decode"):
+            members, skipped = decode_sources([(filename, content_bytes)])
+        if skipped:
+            add(filename, [skipped_member_error(*skipped[0])])
+        else:
+            with stage("scan"):
+                errors = mindix_scan_file_from_content(members[0][1], filename)
+            add(filename, errors)
+        return store
+    if ext in AI_ALLOWED_ARCHIVE:
+        try:
+            with stage("extract"):
+                raw_members, skipped = read_archive_sources(content_bytes, filename)
+        except ArchiveLimitError:
+            raise
+        except (ValueError, zipfile.BadZipFile, tarfile.TarError, OSError, EOFError):
+            raise InvalidArchiveError("Archive invalide ou corrompue.")
+        with stage("decode"):
+            members, not_text = decode_sources(raw_members)
+        del raw_members
+        skipped += not_text
+        notify_total(len(members) + len(skipped))
+        for path, reason in skipped:
+            add(path, [skipped_member_error(path, reason)])
+        with stage("scan"):
+            mindix_scan_many(members, on_file=lambda i, errors: add(members[i][0], errors), keep=False)
+        return store
+    store.add(filename, [{"line":0,"text":"Format non supporté","title":"Format","cause":"Extension non prise en charge","fix":"Utiliser une extension acceptée","severity":4}])
+    return store
+
+def upload_original(filename, content_bytes):
+    """Envoie le fichier au stockage distant et renvoie le message HTML à afficher."""
+    remote_path = f"{AI_UPLOAD_DIR}/{filename}"
+    stream_for_upload = BytesIO(content_bytes)
+    upload_resp = remote_upload_file(remote_path, stream_for_upload, filename=filename, method="POST")
+
+    if upload_resp is None:
+        return "<p style='color:orange;'>⚠️ Échec de l'upload vers le stockage distant (injoignable).</p>"
+    if upload_resp.status_code in (200, 201):
+        return "<p style='color:green;'>✅ Fichier envoyé au stockage distant.</p>"
+    return f"<p style='color:red;'>❌ Erreur lors de l'upload distant : {upload_resp.status_code} - {upload_resp.text}</p>"
+
+def submit_mindix_job(filename, content_bytes):
+    """Crée le job et le met en file ; rend son identifiant sans attendre l'analyse."""
+    purge_expired_jobs()
+    job_id = uuid.uuid4().hex
+    os.makedirs(os.path.dirname(job_path(job_id)), exist_ok=True)
+    now = time.time()
+    write_job(job_id, {"id": job_id, "filename": filename, "status": "queued", "done": 0, "total": None,
+                       "errors": 0, "created": now, "started": None, "finished": None, "error": None,
+                       "owner": job_owner()})
+    open(job_path(job_id, "events.ndjson"), "w").close()
+    with open(job_path(job_id, "upload.bin"), "wb") as f:
+        f.write(content_bytes)
+    get_job_executor().submit(_run_mindix_job, job_id, filename, content_bytes, current_trace_context())
+    return job_id
+
+def _run_mindix_job(job_id, filename, content_bytes, trace_parent=None):
+    if STAGE_TIMING:
+        begin_stages()
+    if trace_parent:
+        # requête d'envoi échantillonnée : le job est tracé aussi, même trace_id
+        begin_trace("mindix-job", *trace_parent, job=job_id, filename=filename)
+    job = read_job(job_id)
+    job.update(status="running", started=time.time())
+    write_job(job_id, job)
+    last_write = [time.monotonic()]
+    events = open(job_path(job_id, "events.ndjson"), "a", encoding="utf-8")
+
+    def emit(event):
+        events.write(json.dumps(event, ensure_ascii=False) + "\n")
+        events.flush()
+
+    def on_total(total):
+        job["total"] = total
+        write_job(job_id, job)
+        emit({"type": "total", "total": total})
+
+    def on_file(path, errors):
+        job["done"] += 1
+        job["errors"] += len(errors)
+        emit({"type": "file", "file": path, "done": job["done"], "errors": errors})
+        if time.monotonic() - last_write[0] >= MINDIX_JOB_PROGRESS_INTERVAL:
+            last_write[0] = time.monotonic()
+            write_job(job_id, job)
+
+    with events:
+        try:
+            store = mindix_analyze_upload(filename, content_bytes, on_total=on_total, on_file=on_file)
+            errors = store.diagnostics()
+            upload_msg = upload_original(filename, content_bytes)
+            write_json_atomic(job_path(job_id, "result.json"),
+                              {"errors": errors, "upload_msg": upload_msg, "diagnostics": store.summary()})
+            job.update(status="done", errors=len(errors), suppressed=store.suppressed())
+            emit({"type": "done", "errors": len(errors), "upload_msg": upload_msg})
+        except (ArchiveLimitError, InvalidArchiveError) as e:
+            job.update(status="error", error=str(e))
+        except Exception as e:
+            print(f"[ERROR] Job MINDIX {job_id} ({filename}) : {e}")
+            job.update(status="error", error="Erreur interne pendant l'analyse.")
+        if job["status"] == "error":
+            emit({"type": "failed", "error": job["error"]})
+    job["finished"] = time.time()
+    timings, total = end_stages()
+    if STAGE_TIMING:
+        # rejouées dans l'en-tête de la page du rapport (préfixe job-)
+        job["timings"] = summarize_stages(timings)
+        if STAGE_TIMING_LOG:
+            log_stages({"job": job_id, "filename": filename, "status": job["status"]}, job["timings"], total)
+    write_job(job_id, job)
+    if trace_parent:
+        current_trace().root["attrs"].update(status=job["status"], files=job["done"], errors=job["errors"])
+        end_trace()
+
+def sse_message(event_type, data, event_id=None):
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event_type}\ndata: {data}\n\n"
+
+def iter_job_events(job_id, offset=0):
+    """
+    Flux SSE des événements du job à partir de l'octet `offset` (= id du dernier
+    événement reçu) ; se termine sur l'événement final ou après MINDIX_SSE_MAX_SECONDS.
+    """
+    yield f"retry: {MINDIX_SSE_RETRY_MS}\n\n"
+    started = last_sent = last_check = time.monotonic()
+    try:
+        events = open(job_path(job_id, "events.ndjson"), "rb")
+    except OSError:
+        yield sse_message("failed", json.dumps({"type": "failed", "error": "Analyse introuvable ou expirée."}))
+        return
+    with events:
+        events.seek(offset)
+        pending = b""
+        while True:
+            chunk = events.read()
+            pending += chunk
+            while b"\n" in pending:  # seulement des lignes complètes
+                line, pending = pending.split(b"\n", 1)
+                offset += len(line) + 1
+                event_type = json.loads(line)["type"]
+                yield sse_message(event_type, line.decode("utf-8"), offset)
+                last_sent = time.monotonic()
+                if event_type in JOB_TERMINAL_EVENTS:
+                    return
+            if chunk:
+                continue
+
+            now = time.monotonic()
+            if now - started > MINDIX_SSE_MAX_SECONDS:
+                return
+            if now - last_check > 2:
+                last_check = now
+                job = read_job(job_id)
+                if job is None or job["status"] == "error" and not events.read(1):
+                    # processus du job mort sans événement final
+                    error = job["error"] if job else "Analyse introuvable ou expirée."
+                    yield sse_message("failed", json.dumps({"type": "failed", "error": error}, ensure_ascii=False))
+                    return
+                events.seek(offset + len(pending))
+            if now - last_sent > MINDIX_SSE_HEARTBEAT:
+                last_sent = now
+                yield ": ping\n\n"
+            time.sleep(MINDIX_SSE_POLL_INTERVAL)
+
+def job_status_payload(job):
+    return {
+        "job_id": job["id"],
+        "filename": job["filename"],
+        "status": job["status"],
+        "done": job["done"],
+        "total": job["total"],
+        "errors": job["errors"],
+        "error": job["error"],
+        "status_url": url_for("mindix_job_status", job_id=job["id"]),
+        "events_url": url_for("mindix_job_events", job_id=job["id"]),
+        "report_url": url_for("mindix", job=job["id"]),
+        "download_url": url_for("mindix_job_corrected", job_id=job["id"]),
+        "expires_at": job["finished"] + MINDIX_JOB_TTL if job.get("finished") else None,
+    }
+
+MINDIX_REPORT_PAGE_SIZE = int(os.environ.get("MINDIX_REPORT_PAGE_SIZE", 200))  # diagnostics par page
+MINDIX_REPORT_FILE_CAP = 50     # diagnostics affichés par fichier sur une page, le reste via ?file=
+SEVERITY_LABELS = {1: "Critique", 2: "Élevée", 3: "Moyenne", 4: "Faible", 5: "Info"}
+
+@timed_stage("report")
+def build_mindix_report(errors, page=1, file=None, collected=None):
+    """
+    Contexte du template mindix_report.html : résumé par sévérité et par fichier
+    (sur tout le rapport), puis une seule page de diagnostics groupés par fichier.
+    `file` restreint la page à un fichier (sans plafond par fichier).
+    `collected` = DiagnosticStore.summary() de l'analyse (diagnostics écartés).
+    """
+    by_file = OrderedDict()
+    severities = {}
+    for e in errors:
+        by_file.setdefault(e.get("file", ""), []).append(e)
+        level = e.get("severity", 0)
+        severities[level] = severities.get(level, 0) + 1
+
+    selected = by_file.get(file, []) if file is not None else [e for errs in by_file.values() for e in errs]
+    pages = max(1, -(-len(selected) // MINDIX_REPORT_PAGE_SIZE))
+    page = min(max(page, 1), pages)
+    groups = []
+    for e in selected[(page - 1) * MINDIX_REPORT_PAGE_SIZE:page * MINDIX_REPORT_PAGE_SIZE]:
+        path = e.get("file", "")
+        if not groups or groups[-1]["path"] != path:
+            groups.append({"path": path, "total": len(by_file[path]), "errors": [], "hidden": 0})
+        group = groups[-1]
+        if file is None and len(group["errors"]) >= MINDIX_REPORT_FILE_CAP:
+            group["hidden"] += 1
+        else:
+            group["errors"].append(e)
+
+    return {
+        "total": len(errors),
+        "severities": [(level, SEVERITY_LABELS.get(level, f"Niveau {level}"), count)
+                       for level, count in sorted(severities.items())],
+        "files": [{"path": path, "count": len(errs), "worst": min(e.get("severity", 5) for e in errs)}
+                  for path, errs in by_file.items()],
+        "file": file,
+        "suppressed": (collected or {}).get("suppressed", 0),
+        "groups": groups,
+        "page": page,
+        "pages": pages,
+    }
+
+def render_mindix_job(job_id, page=1, file=None):
+    """Page ai.html d'un job : progression tant qu'il tourne, rapport une fois fini."""
+    job = read_job(job_id)
+    if job is None:
+        return render_template('ai.html', error="Analyse introuvable ou expirée, renvoie le fichier.", output=None)
+    if job["status"] == "error":
+        return render_template('ai.html', error=job["error"], output=None)
+    if job["status"] != "done":
+        return render_template('ai.html', output=None, error=None, job=job_status_payload(job))
+    add_stages(job.get("timings"), prefix="job-")
+    result = read_job_result(job_id)
+    if result is None:
+        return render_template('ai.html', error="Analyse introuvable ou expirée, renvoie le fichier.", output=None)
+    if not result["errors"]:
+        return render_template('ai.html', output=f"✅ Aucun problème détecté.<br/>{result['upload_msg']}", error=None)
+    return render_template('ai.html', output=None, error=None, job_id=job_id, upload_msg=result["upload_msg"],
+                           report=build_mindix_report(result["errors"], page, file, result.get("diagnostics")),
+                           download_link=url_for('mindix_job_corrected', job_id=job_id))
+
+# ----------------------------
+# API JSON de scan par lot (CI) : POST /api/mindix/scan
+#   multipart : un ou plusieurs champs "files" (ou "file"), le nom de fichier sert de chemin
+#   JSON      : {"files": [{"path": "src/a.py", "content": "..."} |
+#                          {"path": "src/b.c", "content_base64": "..."}]}
+# Les fichiers sont analysés ensemble (lots C/C++, includes résolus entre eux,
+# pool de processus) ; la réponse garde l'ordre d'envoi.
+#
+# Rescan incrémental en deux temps :
+#   1) POST /api/mindix/manifest {"files": [{"path", "sha256"}]} (sha256 des octets
+#      du fichier) -> {"missing": [sha256...], "missing_paths": [...]} : ce que le
+#      serveur n'a pas en cache ;
+#   2) POST /api/mindix/scan avec "manifest" (même liste ; champ de formulaire JSON
+#      en multipart) et seulement les fichiers manquants -> rapport complet, les
+#      autres fichiers venant du cache ("status": "cached").
+# Un C/C++ est en cache si lui et toute sa fermeture d'includes le sont ; dès qu'un
+# C/C++ doit être réanalysé, les en-têtes du manifeste sont aussi demandés (il faut
+# leur contenu pour compiler). Un fichier qui n'est pas de l'UTF-8 valide ne
+# correspond jamais à son hash en cache : il est simplement redemandé à chaque fois.
+# ----------------------------
+MINDIX_API_MAX_FILES = int(os.environ.get("MINDIX_API_MAX_FILES", 200))
+MINDIX_MANIFEST_MAX_FILES = int(os.environ.get("MINDIX_MANIFEST_MAX_FILES", 5000))
+# corps de requête refusé (413) avant d'être lu au-delà : le plus gros cas légitime
+# est une analyse JSON de MINDIX_MAX_ARCHIVE_BYTES en base64 (+ 1/3), plus le manifeste
+MAX_REQUEST_BYTES = int(os.environ.get("MAX_REQUEST_BYTES", MINDIX_MAX_ARCHIVE_BYTES * 4 // 3 + 2 * 1024 * 1024))
+app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BYTES
+C_HEADER_EXT = (".h", ".hpp")
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+def _api_file_error(path, message):
+    return None, f"{path or '?'} : {message}"
+
+def too_many_files_message():
+    return f"trop de fichiers (max {MINDIX_API_MAX_FILES} par requête)"
+
+def request_too_large_message(limit):
+    return f"requête trop volumineuse (max {limit // (1024 * 1024)} Mo)"
+
+def decode_api_file(entry):
+    """Entrée JSON {"path", "content" | "content_base64"} -> ((chemin, octets), erreur)."""
+    if not isinstance(entry, dict):
+        return _api_file_error(None, "chaque fichier doit être un objet JSON")
+    path = entry.get("path")
+    if not isinstance(path, str) or safe_member_path(path) is None:
+        return _api_file_error(path, "champ 'path' manquant ou invalide")
+    path = safe_member_path(path)
+    if isinstance(entry.get("content"), str):
+        return (path, entry["content"].encode("utf-8")), None
+    if isinstance(entry.get("content_base64"), str):
+        try:
+            return (path, base64.b64decode(entry["content_base64"], validate=True)), None
+        except (binascii.Error, ValueError):
+            return _api_file_error(path, "'content_base64' n'est pas du base64 valide")
+    return _api_file_error(path, "champ 'content' ou 'content_base64' manquant")
+
+def parse_manifest(entries):
+    """Liste JSON [{"path", "sha256"}] -> ([(chemin, sha256)], message d'erreur, code HTTP)."""
+    if not isinstance(entries, list):
+        return None, "manifeste attendu : liste [{\"path\", \"sha256\"}]", 400
+    if len(entries) > MINDIX_MANIFEST_MAX_FILES:
+        return None, f"manifeste trop grand (max {MINDIX_MANIFEST_MAX_FILES} fichiers)", 413
+    manifest = []
+    for entry in entries:
+        path = entry.get("path") if isinstance(entry, dict) else None
+        if not isinstance(path, str) or safe_member_path(path) is None:
+            return None, f"{path or '?'} : champ 'path' manquant ou invalide", 400
+        sha = entry.get("sha256")
+        if not isinstance(sha, str) or not _SHA256_RE.match(sha.lower()):
+            return None, f"{path} : champ 'sha256' manquant ou invalide", 400
+        manifest.append((safe_member_path(path), sha.lower()))
+    if len({path for path, _ in manifest}) != len(manifest):
+        return None, "chemins en double dans le manifeste", 400
+    return manifest, None, 200
+
+def parse_scan_api_request():
+    """
+    (fichiers [(chemin, octets)], manifeste [(chemin, sha256)] ou None, erreur, code HTTP).
+    Avec un manifeste, chaque fichier envoyé doit y figurer avec le même hash.
+    """
+    manifest = None
+    if request.mimetype == "multipart/form-data":
+        uploads = request.files.getlist("files") + request.files.getlist("file")
+        if len(uploads) > MINDIX_API_MAX_FILES:
+            return None, None, too_many_files_message(), 413
+        files, total = [], 0
+        for upload in uploads:
+            if safe_member_path(upload.filename or "") is None:
+                return None, None, f"{upload.filename or '?'} : nom de fichier invalide", 400
+            data = upload.read(MINDIX_MAX_MEMBER_BYTES + 1)
+            total += len(data)
+            if total > MINDIX_MAX_ARCHIVE_BYTES:
+                return None, None, request_too_large_message(MINDIX_MAX_ARCHIVE_BYTES), 413
+            files.append((safe_member_path(upload.filename), data))
+        if "manifest" in request.form:
+            try:
+                manifest = json.loads(request.form["manifest"])
+            except ValueError:
+                return None, None, "champ 'manifest' : JSON invalide", 400
+    else:
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict) or not isinstance(body.get("files", []), list) \
+                or "files" not in body and "manifest" not in body:
+            return None, None, "corps attendu : multipart (champ 'files') ou JSON {\"files\": [...]}", 400
+        if len(body.get("files", [])) > MINDIX_API_MAX_FILES:
+            return None, None, too_many_files_message(), 413
+        files, total = [], 0
+        for entry in body.get("files", []):
+            item, error = decode_api_file(entry)
+            if error:
+                return None, None, error, 400
+            total += len(item[1])
+            if total > MINDIX_MAX_ARCHIVE_BYTES:
+                return None, None, request_too_large_message(MINDIX_MAX_ARCHIVE_BYTES), 413
+            files.append(item)
+        manifest = body.get("manifest")
+
+    if manifest is not None:
+        manifest, error, status = parse_manifest(manifest)
+        if error:
+            return None, None, error, status
+        expected = dict(manifest)
+        for path, data in files:
+            if path not in expected:
+                return None, None, f"{path} : absent du manifeste", 400
+            if hashlib.sha256(data).hexdigest() != expected[path]:
+                return None, None, f"{path} : le contenu ne correspond pas au sha256 du manifeste", 400
+    elif not files:
+        return None, None, "aucun fichier envoyé", 400
+    paths = [path for path, _ in files]
+    if len(set(paths)) != len(paths):
+        return None, None, "chemins en double dans la requête", 400
+    return files, manifest, None, 200
+
+def _known_includes(content_hash, name, unknown):
+    """Includes d'un fichier d'après l'index du cache ; sinon `name` est ajouté à `unknown`."""
+    entries = scan_cache.peek(include_index_key(content_hash))
+    if entries is None:
+        unknown.add(name)
+        return ()
+    return [e["include"] for e in entries]
+
+def _manifest_text_hash(raw_sha256):
+    """Hash du texte décodé (clé du cache) d'un fichier du manifeste, d'après l'index du cache."""
+    entries = scan_cache.peek(text_hash_key(raw_sha256))
+    return entries[0]["sha256"] if entries else raw_sha256  # UTF-8 sans BOM : les deux coïncident
+
+def plan_manifest(manifest, skip=(), counted=True):
+    """
+    Manifeste [(chemin, sha256)] -> (cached, needed) : cached[i] = erreurs en cache
+    du fichier i ou None, needed = chemins dont le serveur a besoin du contenu.
+    Les chemins de `skip` ne sont pas cherchés ; counted=False lit le cache sans
+    compter de hit / miss (le tour manifeste de l'échange les a déjà comptés).
+    """
+    lookup = scan_cache.get if counted else scan_cache.peek
+    hashes = {path: _manifest_text_hash(sha) for path, sha in manifest}
+    cached, needed, c_family_missing = [None] * len(manifest), set(), False
+    for i, (path, _) in enumerate(manifest):
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in AI_ALLOWED_SINGLE or path in skip:
+            continue
+        content_hash = hashes[path]
+        if ext in C_FAMILY_EXT:
+            unknown = set()
+            closure = resolve_include_closure(path, hashes,
+                                              includes_of=lambda n: _known_includes(hashes[n], n, unknown))
+            if unknown:  # includes d'un fichier de la fermeture inconnus : fermeture incalculable
+                needed.update(unknown | {path})
+                c_family_missing = True
+                continue
+            content_hash = c_family_closure_hash(content_hash, [(dep, hashes[dep]) for dep in closure])
+        cached[i] = lookup(scan_cache_key(content_hash, ext))
+        if cached[i] is None:
+            needed.add(path)
+            c_family_missing = c_family_missing or ext in C_FAMILY_EXT
+    if c_family_missing:
+        needed.update(path for path, _ in manifest if os.path.splitext(path)[1].lower() in C_HEADER_EXT)
+    return cached, needed
+
+def scan_api_file_report(path, errors=None, status="scanned", reason=None):
+    report = {"path": path, "status": status, "errors": errors or []}
+    if reason:
+        report["reason"] = reason
+    severities = {}
+    for e in report["errors"]:
+        key = str(e.get("severity", 0))
+        severities[key] = severities.get(key, 0) + 1
+    report["severities"] = severities
+    return report
+
+def scan_api_reports(files):
+    """
+    [(chemin, octets)] -> ({chemin: rapport}, DiagnosticStore) ; tous les sources
+    sont analysés ensemble, diagnostics plafonnés par fichier et au total.
+    """
+    reports, sources, store = {}, [], DiagnosticStore()
+    for path, data in files:
+        if os.path.splitext(path)[1].lower() not in AI_ALLOWED_SINGLE:
+            reports[path] = scan_api_file_report(path, status="skipped", reason="extension non prise en charge")
+        elif len(data) > MINDIX_MAX_MEMBER_BYTES:
+            reports[path] = scan_api_file_report(path, status="skipped", reason=member_too_large_reason())
+        else:
+            sources.append((path, data))
+    with stage("decode"):
+        members, skipped = decode_sources(sources)
+        # un manifeste ultérieur donnera le sha256 des octets : on note le hash du texte
+        raw = dict(sources)
+        for path, content in members:
+            raw_sha, text_sha = hashlib.sha256(raw[path]).hexdigest(), content_sha256(content)
+            if raw_sha != text_sha:
+                scan_cache.put(text_hash_key(raw_sha), [{"sha256": text_sha}])
+    for path, reason in skipped:
+        reports[path] = scan_api_file_report(path, status="skipped", reason=reason)
+    with stage("scan"):
+        mindix_scan_many(members, on_file=lambda i, errors: store.add(members[i][0], errors), keep=False)
+    by_file = {}
+    for e in store.diagnostics():
+        by_file.setdefault(e["file"], []).append(e)
+    for path, _ in members:
+        reports[path] = scan_api_file_report(path, by_file.get(path, []))
+        reports[path]["suppressed"] = store.suppressed(path)
+    return reports, store
+
+# ----------------------------
 # Endpoints MINDIX / AI
 # ----------------------------
 @app.route('/mindix-v2', methods=['GET', 'POST'])
@@ -438,79 +3725,192 @@ def favicon():
 @app.route('/ai', methods=['GET', 'POST'])
 def mindix():
     if request.method == 'POST':
+        # formulaire sans JavaScript : même job asynchrone, puis page de suivi
         if 'file' not in request.files:
             return render_template('ai.html', error="Aucun fichier sélectionné", output=None)
         file = request.files['file']
-        if file.filename == '':
-            return render_template('ai.html', error="Nom de fichier vide", output=None)
+        message = check_upload_name(file.filename)
+        if message:
+            return render_template('ai.html', error=message, output=None)
+        job_id = submit_mindix_job(file.filename, file.read())
+        return redirect(url_for('mindix', job=job_id), code=303)
 
-        ext = os.path.splitext(file.filename)[1].lower()
-        if ext not in ALLOWED_EXT:
-            return render_template('ai.html', error="Formats acceptés : .py, .js, .cs, .c, .cpp, .h, .hpp, .zip, .tar, .gz", output=None)
+    job_id = request.args.get('job')
+    if job_id:
+        return render_mindix_job(job_id, request.args.get('page', 1, type=int), request.args.get('file'))
+    return render_template('ai.html', output=None, error=None)
 
-        # Lecture du contenu en mémoire (pour analyse)
-        content_bytes = file.read()
-        try:
-            content = content_bytes.decode('utf-8', errors='replace')
-        except Exception:
-            content = content_bytes.decode('latin-1', errors='replace')
-
-        # Analyse
-        errors = []
-        if ext in AI_ALLOWED_SINGLE:
-            errors = mindix_scan_file_from_content(content, file.filename)
-        elif ext in AI_ALLOWED_ARCHIVE:
-            # write temp archive and extract + scan all allowed files
-            tmp_archive = os.path.join(tempfile.gettempdir(), file.filename)
-            with open(tmp_archive, "wb") as f:
-                f.write(content_bytes)
-            temp_dir = extract_archive(tmp_archive)
-            if not temp_dir:
-                return render_template('ai.html', error="Archive invalide ou corrompue.", output=None)
-            for root, _, files in os.walk(temp_dir):
-                for f in files:
-                    file_ext = os.path.splitext(f)[1].lower()
-                    if file_ext in AI_ALLOWED_SINGLE:
-                        path_full = os.path.join(root, f)
-                        with open(path_full, "r", encoding="utf-8", errors="replace") as fc:
-                            cf = fc.read()
-                        errors += mindix_scan_file_from_content(cf, f)
-            # repack corrected files later if needed (handled below)
-        else:
-            errors = [{"line":0,"text":"Format non supporté","title":"Format","cause":"Extension non prise en charge","fix":"Utiliser une extension acceptée","severity":4}]
+@app.route('/mindix/jobs', methods=['POST'])
+def mindix_job_submit():
+    if 'file' not in request.files:
+        return jsonify({"success": False, "error": "Aucun fichier sélectionné"}), 400
+    file = request.files['file']
+    message = check_upload_name(file.filename)
+    if message:
+        return jsonify({"success": False, "error": message}), 400
+    job_id = submit_mindix_job(file.filename, file.read())
+    job = read_job(job_id)
+    payload = job_status_payload(job)
+    resp = jsonify({"success": True, **payload})
+    resp.status_code = 202
+    resp.headers["Location"] = payload["status_url"]
+    return resp
 
-        # Upload du fichier original (ou corrigé) vers stockage distant
-        remote_path = f"{AI_UPLOAD_DIR}/{file.filename}"
-        stream_for_upload = BytesIO(content.encode('utf-8') if isinstance(content, str) else content_bytes)
-        upload_resp = remote_upload_file(remote_path, stream_for_upload, filename=file.filename, method="POST")
+@app.route('/mindix/jobs/<job_id>', methods=['GET'])
+def mindix_job_status(job_id):
+    job = read_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job inconnu ou expiré"}), 404
+    payload = job_status_payload(job)
+    if job["status"] == "done" and request.args.get("result"):
+        result = read_job_result(job_id) or {}
+        payload["result"] = result.get("errors", [])
+    return jsonify({"success": True, **payload})
 
-        if upload_resp is None:
-            upload_msg = "<p style='color:orange;'>⚠️ Échec de l'upload vers le stockage distant (injoignable).</p>"
-        else:
-            if upload_resp.status_code in (200, 201):
-                upload_msg = "<p style='color:green;'>✅ Fichier envoyé au stockage distant.</p>"
+@app.errorhandler(413)
+def request_entity_too_large(e):
+    message = request_too_large_message(MAX_REQUEST_BYTES)
+    if request.path.startswith(("/api/", "/mindix/")):
+        return jsonify({"success": False, "error": message}), 413
+    return render_template('ai.html', error=message.capitalize() + ".", output=None), 413
+
+@app.route('/api/mindix/manifest', methods=['POST'])
+def api_mindix_manifest():
+    body = request.get_json(silent=True)
+    manifest, error, status = parse_manifest(body.get("files") if isinstance(body, dict) else None)
+    if error:
+        return jsonify({"success": False, "error": error}), status
+    cached, needed = plan_manifest(manifest)
+    missing_paths = [path for path, _ in manifest if path in needed]
+    hashes = dict(manifest)
+    return jsonify({
+        "success": True,
+        "files": len(manifest),
+        "cached": sum(1 for errors in cached if errors is not None),
+        "missing": sorted({hashes[path] for path in missing_paths}),
+        "missing_paths": missing_paths,
+    })
+
+@app.route('/api/mindix/scan', methods=['POST'])
+def api_mindix_scan():
+    started = time.perf_counter()
+    files, manifest, error, status = parse_scan_api_request()
+    if error:
+        return jsonify({"success": False, "error": error}), status
+
+    scanned, store = scan_api_reports(files)
+    if manifest is None:
+        reports = [scanned[path] for path, _ in files]
+    else:
+        # fichiers envoyés + résultats en cache des autres, dans l'ordre du manifeste
+        reports = []
+        # les fichiers envoyés viennent d'être analysés (et comptés) : seuls les autres
+        # sont relus, sans recompter ce que la requête manifeste a déjà compté
+        cached, _ = plan_manifest(manifest, skip=scanned, counted=False)
+        for (path, _), errors in zip(manifest, cached):
+            if path in scanned:
+                reports.append(scanned[path])
+            elif os.path.splitext(path)[1].lower() not in AI_ALLOWED_SINGLE:
+                reports.append(scan_api_file_report(path, status="skipped", reason="extension non prise en charge"))
+            elif errors is not None:
+                reports.append(scan_api_file_report(path, errors, status="cached"))
             else:
-                upload_msg = f"<p style='color:red;'>❌ Erreur lors de l'upload distant : {upload_resp.status_code} - {upload_resp.text}</p>"
-
-        if not errors:
-            return render_template('ai.html', output=f"✅ Aucun problème détecté.<br/>{upload_msg}", error=None)
-
-        # Construire rapport HTML (affiché dans ai.html)
-        report_html = upload_msg + "<h2 style='color:#60a5fa;'>🧠 Rapport MINDIX</h2>"
-        for err in errors:
-            report_html += f"""
-            <div style='background:#1e293b; color:white; padding:12px; border-radius:8px; margin-bottom:12px;'>
-                <p><b>{err.get('title','Erreur')}</b> — ligne {err.get('line',0)}</p>
-                <p>💡 {err.get('cause','')}</p>
-                <p>🛠️ {err.get('fix','')}</p>
-                <div style='background:#0f172a; color:#e2e8f0; padding:8px; border-radius:6px; font-family:monospace;'>
-                    ➡ {err.get('text','')}
-                </div>
-            </div>
-            """
-        return render_template('ai.html', output=None, error=report_html)
+                reports.append(scan_api_file_report(path, status="missing",
+                                                    reason="pas de résultat en cache : renvoie ce fichier"))
 
-    return render_template('ai.html', output=None, error=None)
+    counts = {}
+    for r in reports:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    return jsonify({
+        "success": True,
+        "analyzer_version": MINDIX_ANALYZER_VERSION,
+        "files": reports,
+        "summary": {
+            "files": len(reports),
+            "scanned": counts.get("scanned", 0),
+            "cached": counts.get("cached", 0),
+            "missing": counts.get("missing", 0),
+            "skipped": counts.get("skipped", 0),
+            "errors": sum(len(r["errors"]) for r in reports),
+            "files_with_errors": sum(1 for r in reports if r["errors"]),
+            "suppressed": store.suppressed(),
+            "uploaded_bytes": sum(len(data) for _, data in files),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    })
+
+@app.route('/mindix/jobs/<job_id>/corrected', methods=['GET'])
+def mindix_job_corrected(job_id):
+    """Fichier corrigé ; pour une archive, zip produit en flux (?level=0..9 : compression)."""
+    job = read_job(job_id)
+    path = job_path(job_id, "upload.bin")
+    if job is None or job["status"] != "done" or not os.path.exists(path):
+        return jsonify({"success": False, "error": "Job inconnu, expiré ou pas terminé"}), 404
+    level = request.args.get("level", MINDIX_ZIP_LEVEL, type=int)
+    if not 0 <= level <= 9:
+        return jsonify({"success": False, "error": "level doit être entre 0 et 9"}), 400
+    filename = job["filename"]
+    download_name = corrected_download_name(filename)
+    if os.path.splitext(filename)[1].lower() in AI_ALLOWED_SINGLE:
+        with open(path, "rb") as f:
+            data = f.read()
+        return send_file(BytesIO(corrected_member_bytes(data)), mimetype="text/plain",
+                         as_attachment=True, download_name=download_name)
+
+    # l'archive est lue depuis le disque au fil du zip produit, jamais chargée entière
+    upload = open(path, "rb")
+
+    def generate():
+        try:
+            yield from iter_corrected_zip(upload, filename, level)
+        except (ArchiveLimitError, ValueError, zipfile.BadZipFile, tarfile.TarError, OSError, EOFError) as e:
+            # en-têtes déjà partis : on coupe la connexion plutôt que d'envoyer un zip tronqué "valide"
+            print(f"[WARN] Archive corrigée interrompue ({filename}) : {e}")
+            raise
+
+    resp = Response(stream_with_context(generate()), mimetype="application/zip")
+    resp.call_on_close(upload.close)
+    resp.headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(download_name)}"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+@app.route('/mindix/jobs/<job_id>/events', methods=['GET'])
+def mindix_job_events(job_id):
+    if read_job(job_id) is None:
+        return jsonify({"success": False, "error": "Job inconnu ou expiré"}), 404
+    try:
+        offset = max(int(request.headers.get("Last-Event-ID") or request.args.get("from") or 0), 0)
+    except ValueError:
+        offset = 0
+    resp = Response(stream_with_context(iter_job_events(job_id, offset)), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"  # nginx : pas de mise en tampon du flux
+    return resp
+
+@app.route('/mindix/rules/stats', methods=['GET'])
+def mindix_rules_stats():
+    # compteurs à zéro tant que MINDIX_RULE_STATS=1 n'est pas posé (au démarrage)
+    return jsonify({name: dict(stats, ms=round(stats["ns"] / 1e6, 3)) for name, stats in MINDIX_RULE_STATS.items()})
+
+@app.route('/mindix/cache/stats', methods=['GET'])
+def mindix_cache_stats():
+    return jsonify(scan_cache.stats())
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    if prometheus_client is None:
+        return Response("prometheus_client non installé\n", status=501, mimetype="text/plain")
+    if PROMETHEUS_MULTIPROC_DIR:
+        # agrégat de tous les processus ; pas de registre global (il doublerait ce processus)
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return Response(prometheus_client.generate_latest(registry), content_type=prometheus_client.CONTENT_TYPE_LATEST)
+
+@app.route('/mindix/sandbox/stats', methods=['GET'])
+def mindix_sandbox_stats():
+    return jsonify(sandbox_stats())
 
 # ----------------------------
 # API pour gérer les fichiers distants (routes demandées)
@@ -0,0 +1,427 @@
+"""
+Benchmarks MINDIX.
+
+    python bench_mindix.py python-scanner [--lines 20000] [--repeat 5]
+    python bench_mindix.py tool-io [--files 100]
+    python bench_mindix.py suite [--files 40] [--lines 200] [--error-density 0.05]
+                                 [--archives 5] [--archive-files 50] [--only scan_file]
+                                 [--save-baseline bench.json] [--baseline bench.json]
+
+python-scanner : compare le scanner Python actuel (ast + moteur de règles,
+tokenize si le code ne compile pas) à l'ancienne implémentation (ast + regex ligne par ligne + heuristic_checks)
+sur un gros fichier généré, et compte les faux positifs de l'ancienne.
+
+tool-io : appels d'outils externes avec fichier temporaire sur disque
+(ancien chemin) vs stdin / tmpfs ; compte les fichiers créés et supprimés
+par le processus (audit hooks), ses appels système d'écriture
+(/proc/self/io) et le temps total.
+
+suite : génère un corpus synthétique (Python / JS / C / C++ / C#, densité
+d'erreurs réglable, archives zip ou tar.gz) et mesure mindix_scan_all_errors,
+mindix_scan_file_from_content, check_with_tool et des requêtes /ai complètes
+(job + suivi jusqu'au rapport) : fichiers/s, octets/s, latences p50/p90/p99.
+--save-baseline enregistre les résultats, --baseline les compare à une
+référence et sort en erreur (code 1) si un débit baisse de plus de
+--max-regression.
+"""
+import re
+import ast
+import sys
+import time
+import random
+import os
+import argparse
+import tempfile
+import statistics
+import traceback
+import json
+import io
+import zipfile
+import tarfile
+
+# cache et jobs du benchmark à part : ni lecture du cache réel, ni pollution
+# (les workers du pool d'analyse réimportent ce module : ils héritent de ces variables)
+for _var, _prefix in (("MINDIX_CACHE_DIR", "mindix_bench_cache_"), ("MINDIX_JOBS_DIR", "mindix_bench_jobs_")):
+    if _var not in os.environ:
+        os.environ[_var] = tempfile.mkdtemp(prefix=_prefix)
+
+import app
+
+
+# ----------------------------
+# Ancienne implémentation (référence pour la comparaison)
+# ----------------------------
+def legacy_scan_python(code: str, filename: str):
+    errors = []
+    lines = code.splitlines()
+    try:
+        ast.parse(code, filename)
+    except SyntaxError as e:
+        title, cause, fix, severity = app.mindix_analyze_error(traceback.format_exc())
+        errors.append({"line": e.lineno or 0, "text": e.text.strip() if e.text else "",
+                       "title": title, "cause": cause, "fix": fix, "severity": severity})
+    for i, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if re.search(r'/\s*0(?!\.)', stripped):
+            errors.append({"line": i, "text": stripped, "title": "➗ Division par zéro",
+                           "cause": "Division par zéro détectée.", "fix": "Vérifie le dénominateur.", "severity": 2})
+    return errors + app.heuristic_checks(code)
+
+
+# ----------------------------
+# Génération de code Python
+# ----------------------------
+PY_SNIPPETS = (
+    "total = total + {n} * 3",
+    "ratio = total / {n}",
+    "url = 'http://example.com/0'  # chaîne : pas une division",
+    "# commentaire avec / 0 dedans",
+    "path = \"a/0/b\"",
+    "data = {{'k': [{n}, ({n} + 1)]}}",
+    "text = \"l'apostrophe\"",
+    "half = value // 2",
+)
+
+# lignes sans rien qui ressemble à "/ 0" (cas courant : aucun faux positif possible)
+PY_CLEAN_SNIPPETS = tuple(s for s in PY_SNIPPETS if "/0" not in s and "/ 0" not in s)
+
+def generate_python(lines: int, zero_div_every: int = 50, seed: int = 0, clean: bool = False):
+    """Fichier Python valide de `lines` lignes, avec une vraie division par zéro toutes les N lignes."""
+    rng = random.Random(seed)
+    snippets = PY_CLEAN_SNIPPETS if clean else PY_SNIPPETS
+    out = ["def f(value):", "    total = 0"]
+    for i in range(lines):
+        if zero_div_every and i % zero_div_every == zero_div_every - 1:
+            out.append(f"    bad_{i} = value / 0")
+        else:
+            out.append("    " + rng.choice(snippets).format(n=i + 1))
+    out.append("    return total")
+    return "\n".join(out) + "\n", lines // zero_div_every if zero_div_every else 0
+
+
+def time_call(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, samples
+
+
+def bench_python_scanner(lines: int, repeat: int):
+    for label, zero_div_every, clean in (("piégé (\"/0\" dans chaînes et commentaires)", 50, False),
+                                         ("propre, avec divisions par zéro", 50, True),
+                                         ("propre, sans division par zéro", 0, True)):
+        print(f"\n== Corpus {label}")
+        _bench_python_corpus(*generate_python(lines, zero_div_every=zero_div_every, clean=clean), repeat)
+
+def _bench_python_corpus(code, expected, repeat):
+    size = len(code.encode("utf-8"))
+    print(f"{len(code.splitlines())} lignes, {size / 1024:.0f} Ko, {expected} vraies divisions par zéro")
+
+    for label, fn in (("ancien (ast + regex + heuristique)", lambda: legacy_scan_python(code, "bench.py")),
+                      ("actuel (ast + règles)", lambda: app.mindix_scan_all_errors(code, "bench.py"))):
+        errors, samples = time_call(fn, repeat)
+        found = sum(1 for e in errors if e["title"] == "➗ Division par zéro")
+        best = min(samples)
+        print(f"  {label:38s} min {best * 1000:8.1f} ms  médiane {statistics.median(samples) * 1000:8.1f} ms  "
+              f"{size / best / 1e6:6.1f} Mo/s  diagnostics {len(errors):5d}  "
+              f"faux positifs div/0 {found - expected:4d}")
+
+
+# ----------------------------
+# Outils externes : fichier temporaire vs stdin / tmpfs
+# ----------------------------
+TOOL_SAMPLES = {
+    ".c": "int f(int a) {{ return a + {n}; }}\nint g(void) {{ return f({n}) }}\n",
+    ".cpp": "#include <cstddef>\nstd::size_t f{n}() {{ return {n}; }}\n",
+    ".js": "function f{n}(a) {{ return a + {n}; }}\nf{n}(1\n",
+}
+
+_io_events = {"open_write": 0, "remove": 0}
+
+def _audit(event, args):
+    # args[0] entier = fd déjà ouvert (pipes de subprocess), pas un fichier créé
+    if event == "open" and isinstance(args[0], str) and args[1] and any(c in str(args[1]) for c in "wax+"):
+        _io_events["open_write"] += 1
+    elif event == "os.remove":
+        _io_events["remove"] += 1
+
+def proc_io():
+    try:
+        with open("/proc/self/io") as f:
+            return {k: int(v) for k, v in (line.split(": ") for line in f)}
+    except OSError:
+        return {}
+
+def legacy_tool_check(content, ext):
+    """Ancien chemin : fichier dans tempfile.gettempdir(), outil, suppression."""
+    tmp_path = os.path.join(tempfile.gettempdir(), f"mindix_tmp_{os.getpid()}_{os.urandom(6).hex()}{ext}")
+    with open(tmp_path, "w", encoding="utf-8", errors="replace") as f:
+        f.write(content)
+    try:
+        return app.check_with_tool(tmp_path, ext)
+    finally:
+        os.remove(tmp_path)
+
+def current_tool_check(content, ext):
+    if ext in app.C_FAMILY_EXT:
+        return app.check_c_family_files([(f"bench{ext}", content)])
+    return app.check_content_with_tool(content, ext)
+
+def bench_tool_io(files: int):
+    sys.addaudithook(_audit)
+    print(f"tmpfs : {app.MINDIX_TMPFS_DIR}")
+    for ext, template in TOOL_SAMPLES.items():
+        sources = [template.format(n=i) for i in range(files)]
+        print(f"\n== {ext} ({files} fichiers)")
+        for label, fn in (("fichier temporaire", legacy_tool_check), ("stdin / tmpfs", current_tool_check)):
+            _io_events.update(open_write=0, remove=0)
+            before = proc_io()
+            start = time.perf_counter()
+            for src in sources:
+                fn(src, ext)
+            elapsed = time.perf_counter() - start
+            after = proc_io()
+            print(f"  {label:20s} {elapsed * 1000 / files:7.2f} ms/fichier  "
+                  f"fichiers créés {_io_events['open_write']:5d}  supprimés {_io_events['remove']:5d}  "
+                  f"write() {after.get('syscw', 0) - before.get('syscw', 0):6d}  "
+                  f"octets écrits sur disque {after.get('write_bytes', 0) - before.get('write_bytes', 0):8d}")
+
+# ----------------------------
+# Suite complète : corpus synthétique multi-langages
+# ----------------------------
+# par langage : en-tête (n = numéro du fichier), lignes correctes, lignes fautives, fin
+CORPUS_LANGUAGES = {
+    ".py": ("def f{n}(value):\n    total = 0\n",
+            ("    total = total + {i} * 3", "    ratio = total / ({i} + value)", "    name = 'item{i}'"),
+            ("    bad_{i} = value / 0",),
+            "    return total\n"),
+    ".js": ("function f{n}(value) {{\n    let total = 0;\n",
+            ("    total = total + {i} * 3;", "    const name{i} = `item{i}`;", "    if (value > {i}) {{ total -= 1; }}"),
+            ("    total = (total + {i};",),
+            "    return total;\n}}\n"),
+    ".c": ("int f{n}(int value) {{\n    int total = 0;\n",
+           ("    total += {i} * 3;", "    if (value > {i}) {{ total -= 1; }}", "    total ^= value + {i};"),
+           ("    total += {i}",),
+           "    return total;\n}}\n"),
+    ".cpp": ("namespace n{n} {{\nint f(int value) {{\n    auto total = 0;\n",
+             ("    total += {i} * 3;", "    if (value > {i}) {{ total -= 1; }}", "    const auto v{i} = total + value;"),
+             ("    total += {i}",),
+             "    return total;\n}}\n}}\n"),
+    ".cs": ("public static class C{n} {{\n    public static int F(int value) {{\n        int total = 0;\n",
+            ("        total += {i} * 3;", "        if (value > {i}) {{ total -= 1; }}", "        var v{i} = total + value;"),
+            ("        total += {i}",),
+            "        return total;\n    }}\n}}\n"),
+}
+
+def generate_source(ext: str, lines: int, error_density: float, seed: int):
+    """Source de `lines` lignes de corps dont environ `error_density` fautives ; contenu unique par seed."""
+    head, ok, bad, tail = CORPUS_LANGUAGES[ext]
+    rng = random.Random(f"{ext}:{seed}")
+    body = [(rng.choice(bad) if rng.random() < error_density else rng.choice(ok)).format(i=i)
+            for i in range(lines)]
+    return head.format(n=seed) + "\n".join(body) + "\n" + tail.format(n=seed)
+
+def generate_archive(files: int, lines: int, error_density: float, seed: int, fmt: str = "zip"):
+    """Archive (octets) de `files` sources, langages mélangés, dans des sous-dossiers."""
+    exts = list(CORPUS_LANGUAGES)
+    members = [(f"src/m{k % 7}/file{k}{exts[k % len(exts)]}",
+                generate_source(exts[k % len(exts)], lines, error_density, seed * 100000 + k).encode("utf-8"))
+               for k in range(files)]
+    buf = io.BytesIO()
+    if fmt == "zip":
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, data in members:
+                zf.writestr(name, data)
+    else:
+        with tarfile.open(fileobj=buf, mode="w:gz") as tf:
+            for name, data in members:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tf.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+def percentile(sorted_values, q):
+    """Percentile au rang le plus proche (q entre 0 et 100)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+def measure(items, fn):
+    """items = [(objet, octets, fichiers)] ; fn(objet) chronométré un par un."""
+    latencies, total_bytes, total_files = [], 0, 0
+    start = time.perf_counter()
+    for obj, size, files in items:
+        t0 = time.perf_counter()
+        fn(obj)
+        latencies.append(time.perf_counter() - t0)
+        total_bytes += size
+        total_files += files
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "items": len(items),
+        "files": total_files,
+        "bytes": total_bytes,
+        "seconds": round(elapsed, 4),
+        "files_per_s": round(total_files / elapsed, 2) if elapsed else 0.0,
+        "bytes_per_s": round(total_bytes / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+def _source_items(ext, args, offset=0):
+    items = []
+    for k in range(args.files):
+        code = generate_source(ext, args.lines, args.error_density, args.seed * 1000 + offset + k)
+        items.append(((f"bench{k}{ext}", code), len(code.encode("utf-8")), 1))
+    return items
+
+def _run_ai_request(client, payload, name):
+    """POST du formulaire /ai puis suivi du job jusqu'au rapport (comme le navigateur sans JS)."""
+    resp = client.post("/ai", data={"file": (io.BytesIO(payload), name)}, content_type="multipart/form-data")
+    job_id = resp.headers["Location"].rsplit("job=", 1)[1]
+    while True:
+        status = client.get(f"/mindix/jobs/{job_id}").get_json()
+        if status["status"] in ("done", "error"):
+            break
+        time.sleep(0.005)
+    client.get(status["report_url"])
+    if status["status"] == "error":
+        raise RuntimeError(status["error"])
+
+def suite_cases(args):
+    """Cas du benchmark : nom -> fonction rendant (items, fn) ou None si indisponible."""
+    cases = {}
+
+    def scan_all_errors():
+        return _source_items(".py", args), lambda item: app.mindix_scan_all_errors(item[1], item[0])
+    cases["mindix_scan_all_errors.py"] = scan_all_errors
+
+    for offset, ext in enumerate(CORPUS_LANGUAGES, 1):
+        def from_content(ext=ext, offset=offset):
+            # contenus différents à chaque cas : pas de hit de cache
+            return (_source_items(ext, args, offset * 10000),
+                    lambda item: app.mindix_scan_file_from_content(item[1], item[0]))
+        cases[f"mindix_scan_file_from_content{ext}"] = from_content
+
+    for offset, ext in enumerate((".c", ".cpp", ".js", ".cs"), 1):
+        def with_tool(ext=ext, offset=offset):
+            workdir = tempfile.mkdtemp(prefix="mindix_bench_tool_")
+            items = []
+            for (name, code), size, files in _source_items(ext, args, offset * 20000):
+                path = os.path.join(workdir, name)
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(code)
+                items.append((path, size, files))
+            if app.check_with_tool(items[0][0], ext) is None:
+                return None  # outil absent (ex: mcs)
+            return items, lambda path: app.check_with_tool(path, ext)
+        cases[f"check_with_tool{ext}"] = with_tool
+
+    for fmt in ("zip", "tar.gz"):
+        def ai_request(fmt=fmt):
+            client = app.app.test_client()
+            items = []
+            for k in range(args.archives):
+                payload = generate_archive(args.archive_files, args.lines, args.error_density,
+                                           args.seed * 1000 + k + (500 if fmt == "zip" else 700), fmt)
+                items.append(((payload, f"bench{k}.{fmt}"), len(payload), args.archive_files))
+            return items, lambda item: _run_ai_request(client, *item)
+        cases[f"ai_request.{fmt}"] = ai_request
+    return cases
+
+def compare_with_baseline(results, baseline, max_regression):
+    """Affiche les écarts de débit et de p90 ; renvoie la liste des cas en régression."""
+    regressions = []
+    print(f"\n== Comparaison avec la référence (régression si débit < -{max_regression:.0%})")
+    for name, current in results.items():
+        ref = baseline.get("results", {}).get(name)
+        if not ref or not ref.get("files_per_s"):
+            print(f"  {name:42s} (absent de la référence)")
+            continue
+        speed = current["files_per_s"] / ref["files_per_s"] - 1
+        p90 = current["p90_ms"] / ref["p90_ms"] - 1 if ref.get("p90_ms") else 0.0
+        flag = ""
+        if speed < -max_regression:
+            regressions.append(name)
+            flag = "  <-- RÉGRESSION"
+        print(f"  {name:42s} débit {speed:+7.1%}   p90 {p90:+7.1%}{flag}")
+    return regressions
+
+def bench_suite(args):
+    if not args.with_upload:
+        # le stockage distant n'est pas ce qu'on mesure
+        app.upload_original = lambda filename, content_bytes: ""
+    print(f"corpus : {args.files} fichiers x {args.lines} lignes par langage, densité d'erreurs {args.error_density:g}, "
+          f"{args.archives} archives x {args.archive_files} fichiers ; workers {app.MINDIX_SCAN_WORKERS}")
+    print(f"  {'cas':42s} {'fichiers/s':>11s} {'Ko/s':>10s} {'p50 ms':>9s} {'p90 ms':>9s} {'p99 ms':>9s}")
+    results = {}
+    for name, build in suite_cases(args).items():
+        if args.only and args.only not in name:
+            continue
+        prepared = build()
+        if prepared is None:
+            print(f"  {name:42s} indisponible (outil absent)")
+            continue
+        items, fn = prepared
+        stats = measure(items, fn)
+        results[name] = stats
+        print(f"  {name:42s} {stats['files_per_s']:11.1f} {stats['bytes_per_s'] / 1024:10.1f} "
+              f"{stats['p50_ms']:9.2f} {stats['p90_ms']:9.2f} {stats['p99_ms']:9.2f}")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "analyzer_version": app.MINDIX_ANALYZER_VERSION,
+        "params": {k: getattr(args, k) for k in ("files", "lines", "error_density", "archives", "archive_files", "seed")},
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+        print(f"\n[SUCCESS] Référence enregistrée : {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("params") != report["params"]:
+            print("[WARN] paramètres du corpus différents de la référence : comparaison indicative")
+        if compare_with_baseline(results, baseline, args.max_regression):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks MINDIX")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("python-scanner", help="scanner Python actuel vs ancien")
+    p.add_argument("--lines", type=int, default=20000)
+    p.add_argument("--repeat", type=int, default=5)
+    p = sub.add_parser("tool-io", help="outils externes : fichier temporaire vs stdin / tmpfs")
+    p.add_argument("--files", type=int, default=100)
+    p = sub.add_parser("suite", help="débit et latences sur un corpus synthétique, avec référence")
+    p.add_argument("--files", type=int, default=40, help="fichiers par langage et par cas")
+    p.add_argument("--lines", type=int, default=200, help="lignes de corps par fichier")
+    p.add_argument("--error-density", type=float, default=0.05, help="part de lignes fautives (0..1)")
+    p.add_argument("--archives", type=int, default=5, help="requêtes /ai par format d'archive")
+    p.add_argument("--archive-files", type=int, default=50, help="fichiers par archive")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--only", help="ne lancer que les cas dont le nom contient ce texte")
+    p.add_argument("--save-baseline", metavar="FICHIER", help="enregistre les résultats comme référence")
+    p.add_argument("--baseline", metavar="FICHIER", help="compare à une référence enregistrée")
+    p.add_argument("--max-regression", type=float, default=0.15, help="baisse de débit tolérée (0.15 = 15 %%)")
+    p.add_argument("--with-upload", action="store_true", help="inclure l'envoi au stockage distant dans /ai")
+    args = parser.parse_args()
+
+    if args.command == "python-scanner":
+        bench_python_scanner(args.lines, args.repeat)
+    elif args.command == "tool-io":
+        bench_tool_io(args.files)
+    elif args.command == "suite":
+        sys.exit(bench_suite(args))
+    sys.exit(0)
@@ -0,0 +1,147 @@
+"""
+Build des assets statiques (à lancer avant le déploiement) :
+
+    python build_assets.py
+
+- copie chaque fichier de static/ vers static/dist/ sous un nom empreinté
+  (nom.<hash>.ext) pour pouvoir le servir avec un cache "immutable" ;
+- génère pour les images lourdes des variantes redimensionnées + WebP/AVIF
+  (si Pillow et les codecs sont disponibles) ;
+- écrit static/dist/manifest.json, lu par app.py (asset_url / asset_img).
+"""
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+from io import BytesIO
+
+try:
+    from PIL import Image, features
+except ImportError:  # sans Pillow : empreintes seulement, pas de variantes
+    Image = None
+    features = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+DIST_DIRNAME = "dist"
+DIST_DIR = os.path.join(STATIC_DIR, DIST_DIRNAME)
+MANIFEST_FILE = os.path.join(DIST_DIR, "manifest.json")
+
+HASH_LENGTH = 12
+IMAGE_EXT = ('.png', '.jpg', '.jpeg')
+# largeurs générées (on ne dépasse jamais la largeur d'origine)
+VARIANT_WIDTHS = (80, 160, 320, 640, 1280)
+WEBP_QUALITY = 80
+AVIF_QUALITY = 55
+JPEG_QUALITY = 82
+
+
+def content_hash(data: bytes):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+def fingerprinted_name(rel_path: str, digest: str, suffix=""):
+    """'img/logo.png' -> 'dist/img/logo<suffix>.<hash>.png' (chemin relatif à static/)."""
+    stem, ext = os.path.splitext(rel_path)
+    return f"{DIST_DIRNAME}/{stem}{suffix}.{digest}{ext}".replace(os.sep, "/")
+
+def write_dist(rel_dist_path: str, data: bytes):
+    full = os.path.join(STATIC_DIR, rel_dist_path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    if not os.path.exists(full):  # même nom = même contenu
+        with open(full, "wb") as f:
+            f.write(data)
+
+def iter_static_files():
+    for root, dirs, files in os.walk(STATIC_DIR):
+        # on ne ré-empreinte jamais la sortie du build
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != DIST_DIR]
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            yield os.path.relpath(full, STATIC_DIR).replace(os.sep, "/"), full
+
+def available_formats():
+    formats = []
+    if features is not None:
+        if features.check("avif"):
+            formats.append("avif")
+        if features.check("webp"):
+            formats.append("webp")
+    return formats
+
+def encode_image(img, fmt: str):
+    buf = BytesIO()
+    if fmt == "avif":
+        img.save(buf, "AVIF", quality=AVIF_QUALITY)
+    elif fmt == "webp":
+        img.save(buf, "WEBP", quality=WEBP_QUALITY, method=6)
+    elif fmt == "png":
+        img.save(buf, "PNG", optimize=True)
+    else:
+        img.convert("RGB").save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buf.getvalue()
+
+def build_image_variants(rel_path: str, data: bytes, min_size: int):
+    """Variantes redimensionnées (format d'origine + WebP/AVIF) d'une image."""
+    img = Image.open(BytesIO(data))
+    img.load()
+    width, height = img.size
+    info = {"width": width, "height": height, "variants": []}
+    if len(data) < min_size:
+        return info
+
+    orig_fmt = "png" if rel_path.lower().endswith(".png") else "jpeg"
+    widths = sorted({w for w in VARIANT_WIDTHS if w < width} | {width})
+    for w in widths:
+        resized = img if w == width else img.resize((w, round(height * w / width)), Image.LANCZOS)
+        for fmt in available_formats() + [orig_fmt]:
+            if fmt == orig_fmt and w == width:
+                continue  # c'est le fichier d'origine empreinté
+            encoded = encode_image(resized, fmt)
+            ext = ".jpg" if fmt == "jpeg" else f".{fmt}"
+            stem = os.path.splitext(rel_path)[0]
+            rel_dist = fingerprinted_name(stem + ext, content_hash(encoded), suffix=f".{w}w")
+            write_dist(rel_dist, encoded)
+            info["variants"].append({"path": rel_dist, "width": w, "format": fmt, "bytes": len(encoded)})
+    return info
+
+def build(min_image_size: int, clean: bool):
+    if clean and os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    os.makedirs(DIST_DIR, exist_ok=True)
+    if Image is None:
+        print("[WARN] Pillow absent : pas de variantes d'images (pip install Pillow)")
+
+    manifest = {"files": {}, "images": {}}
+    for rel_path, full in iter_static_files():
+        with open(full, "rb") as f:
+            data = f.read()
+        rel_dist = fingerprinted_name(rel_path, content_hash(data))
+        write_dist(rel_dist, data)
+        manifest["files"][rel_path] = rel_dist
+
+        if Image is not None and rel_path.lower().endswith(IMAGE_EXT):
+            info = build_image_variants(rel_path, data, min_image_size)
+            info["bytes"] = len(data)
+            manifest["images"][rel_path] = info
+            saved = min((v["bytes"] for v in info["variants"]), default=len(data))
+            print(f"[ASSET] {rel_path} -> {rel_dist} ({len(info['variants'])} variantes, min {saved} o / {len(data)} o)")
+        else:
+            print(f"[ASSET] {rel_path} -> {rel_dist}")
+
+    tmp = MANIFEST_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=4)
+    os.replace(tmp, MANIFEST_FILE)
+    print(f"[SUCCESS] {len(manifest['files'])} fichiers, manifeste : {MANIFEST_FILE}")
+    return manifest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Empreinte et optimise les assets de static/.")
+    parser.add_argument("--min-image-size", type=int, default=8 * 1024,
+                        help="taille (octets) en dessous de laquelle on ne génère pas de variantes")
+    parser.add_argument("--no-clean", action="store_true", help="ne pas vider static/dist/ avant le build")
+    args = parser.parse_args()
+    build(args.min_image_size, clean=not args.no_clean)
+    sys.exit(0)
@@ -0,0 +1,29 @@
+"""
+Config gunicorn, chargée automatiquement quand on lance `gunicorn app:app` depuis ce dossier.
+
+Workers gthread (WEB_CONCURRENCY workers x GUNICORN_THREADS threads) : les flux SSE des
+pages de suivi ne bloquent pas le reste du site.
+
+Métriques multi-processus : définir PROMETHEUS_MULTIPROC_DIR (dossier dédié, vidé au
+démarrage) dans l'environnement AVANT de lancer gunicorn, pour que /metrics agrège
+les valeurs de tous les workers.
+"""
+import os
+import shutil
+
+# threads : un flux SSE de suivi ou un envoi lent occupe un thread, pas un worker entier
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+
+def on_starting(server):
+    # des fichiers laissés par un ancien démarrage s'ajouteraient aux compteurs
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
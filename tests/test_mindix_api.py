@@ -0,0 +1,38 @@
+import hashlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "MINDIX_SCAN_WORKERS", 1)
+    monkeypatch.setattr(app, "scan_cache", app.ScanResultCache(str(tmp_path), 100, 10 * 1024 * 1024))
+    return app.app.test_client()
+
+
+def manifest_of(files):
+    return [{"path": path, "sha256": hashlib.sha256(data).hexdigest()} for path, data in files.items()]
+
+
+def test_two_phase_upload_counts_each_lookup_once(client):
+    files = {"a.py": b"a = 1/0\n", "b.py": b"b = 2\n", "c.py": b"c = 3/0\n"}
+    app.mindix_scan_many([("a.py", files["a.py"].decode())])
+    app.scan_cache.counters.update(memory_hits=0, disk_hits=0, misses=0)
+
+    plan = client.post("/api/mindix/manifest", json={"files": manifest_of(files)}).get_json()
+    assert plan["missing_paths"] == ["b.py", "c.py"]
+    report = client.post("/api/mindix/scan", json={
+        "manifest": manifest_of(files),
+        "files": [{"path": path, "content": files[path].decode()} for path in plan["missing_paths"]],
+    }).get_json()
+
+    assert [f["status"] for f in report["files"]] == ["cached", "scanned", "scanned"]
+    counters = app.scan_cache.counters
+    # a : un hit au tour manifeste ; b et c : un miss au tour manifeste, un à l'analyse
+    assert (counters["memory_hits"] + counters["disk_hits"], counters["misses"]) == (1, 4)
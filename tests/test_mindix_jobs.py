@@ -0,0 +1,48 @@
+import io
+import os
+import sys
+import time
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "MINDIX_JOBS_DIR", str(tmp_path / "jobs"))
+    monkeypatch.setattr(app, "MINDIX_SCAN_WORKERS", 1)
+    monkeypatch.setattr(app, "scan_cache", app.ScanResultCache(str(tmp_path / "cache"), 100, 10 * 1024 * 1024))
+    return app.app.test_client()
+
+
+def wait_done(client, job_id):
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        job = client.get(f"/mindix/jobs/{job_id}").get_json()
+        if job["status"] in ("done", "error"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError("job jamais terminé")
+
+
+def test_corrected_archive_is_streamed_from_the_upload_file(client, monkeypatch):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("src/a.py", "print('x'\n")
+        zf.writestr("data.bin", os.urandom(4096))
+    job_id = client.post("/mindix/jobs", data={"file": (io.BytesIO(archive.getvalue()), "projet.zip")}).get_json()["job_id"]
+    assert wait_done(client, job_id)["status"] == "done"
+
+    sources = []
+    original = app.iter_corrected_zip
+    monkeypatch.setattr(app, "iter_corrected_zip", lambda data, *a: sources.append(data) or original(data, *a))
+    resp = client.get(f"/mindix/jobs/{job_id}/corrected")
+
+    with zipfile.ZipFile(io.BytesIO(resp.get_data())) as zf:
+        assert zf.read("src/a.py") == b"print('x'\n)"
+        assert len(zf.read("data.bin")) == 4096
+    assert not isinstance(sources[0], (bytes, bytearray))  # fichier ouvert, pas l'archive en mémoire
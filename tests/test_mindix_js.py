@@ -0,0 +1,42 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node absent")
+
+ESM = 'import fs from "fs";\nexport const a = 1;\nconst b = await Promise.resolve(2);\n'
+ESM_BROKEN = 'import fs from "fs";\nexport const a = 1;\nlet x = ;\n'
+
+
+def test_stdin_check_accepts_es_modules():
+    assert app.check_content_with_tool(ESM, ".js") == []
+
+
+def test_stdin_check_reports_module_errors_at_their_line():
+    errors = app.check_content_with_tool(ESM_BROKEN, ".js")
+    assert [(e["line"], e["text"]) for e in errors] == [(3, "SyntaxError: Unexpected token ';'")]
+
+
+def test_stdin_check_still_reports_commonjs_errors():
+    errors = app.check_content_with_tool("const a = 1;\nlet y = ;\n", ".js")
+    assert [e["line"] for e in errors] == [2]
+
+
+def test_worker_accepts_es_modules():
+    assert app.check_with_worker(ESM, "module.js", ".js") == []
+
+
+def test_worker_reports_module_errors_at_their_line():
+    errors = app.check_with_worker(ESM_BROKEN, "module.js", ".js")
+    assert [(e["line"], e["text"]) for e in errors] == [(3, "SyntaxError: Unexpected token ';'")]
+
+
+def test_worker_still_reports_commonjs_errors():
+    errors = app.check_with_worker("const a = 1;\nlet y = ;\n", "script.js", ".js")
+    assert [e["line"] for e in errors] == [2]
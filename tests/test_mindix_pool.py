@@ -0,0 +1,74 @@
+import os
+import shutil
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# lu par les workers du pool (forkserver) à leur démarrage
+os.environ["MINDIX_FILE_TIMEOUT"] = "1"
+
+import app
+
+SLOW_CPP = (
+    "constexpr long f(long n){long s=0; for(long i=0;i<n;i++) for(long j=0;j<200;j++) s+=i^j; return s;}\n"
+    "static_assert(f(100000) != 1, \"x\");\n"
+)
+
+
+@pytest.fixture
+def pool(monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "MINDIX_FILE_TIMEOUT", 1.0)
+    monkeypatch.setattr(app, "MINDIX_SCAN_WORKERS", 2)
+    monkeypatch.setattr(app, "MINDIX_CC_BATCH_SIZE", 1)
+    monkeypatch.setattr(app, "scan_cache", app.ScanResultCache(str(tmp_path), 100, 10 * 1024 * 1024))
+    yield
+    app.reset_scan_pool(kill=True)
+
+
+def scan_in_threads(batches, during=None):
+    results = {}
+
+    def run(name):
+        results[name] = app.mindix_scan_many(batches[name])
+    threads = [threading.Thread(target=run, args=(name,)) for name in batches]
+    for thread in threads:
+        thread.start()
+    if during:
+        during()
+    for thread in threads:
+        thread.join(120)
+    return {name: Counter(e[0]["title"] if e else None for e in errors) for name, errors in results.items()}
+
+
+def python_files(prefix, count, lines=2000):
+    return [(f"{prefix}{i}.py", f"y = {i}/0\n" + "z = 1\n" * lines + f"# {prefix}{i}\n") for i in range(count)]
+
+
+@pytest.mark.skipif(shutil.which("g++") is None, reason="g++ absent")
+def test_overrun_stops_in_its_worker_without_recycling_the_pool(pool):
+    slow = [(f"slow{i}.cpp", SLOW_CPP + f"// {i}\n") for i in range(2)]
+    recycled = set(app._recycled_generations)
+    titles = scan_in_threads({"slow": slow + python_files("a", 4, 1), "other": python_files("b", 20)})
+
+    assert titles["slow"][app.TIMEOUT_TITLE] == 2
+    assert titles["slow"][app.TIMEOUT_TITLE] + titles["slow"]["➗ Division par zéro"] == 6
+    assert titles["other"] == Counter({"➗ Division par zéro": 20})
+    assert app._recycled_generations == recycled  # personne n'a tué le pool
+
+
+def test_killed_worker_does_not_fail_other_callers_files(pool):
+    def kill_one_worker():
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline and not (app._scan_pool and app._scan_pool._processes):
+            time.sleep(0.05)
+        time.sleep(0.3)
+        os.kill(next(iter(app._scan_pool._processes)), signal.SIGKILL)
+
+    titles = scan_in_threads({"a": python_files("a", 30), "b": python_files("b", 30)}, during=kill_one_worker)
+
+    assert titles == {"a": Counter({"➗ Division par zéro": 30}), "b": Counter({"➗ Division par zéro": 30})}
@@ -0,0 +1,42 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# lu par les workers du pool (forkserver) à leur démarrage
+os.environ["MINDIX_RULE_STATS"] = "1"
+
+import app
+
+
+def test_findings_follow_source_order():
+    errors = app.mindix_scan_all_errors("a = 1/0\nb = 2/0\nc = 3/0\n", "ordre.py")
+    assert [e["line"] for e in errors] == [1, 2, 3]
+
+
+def test_nested_findings_stay_in_source_order():
+    code = "def f():\n    if True:\n        x = 1/0\n    return 2/0\ny = 3/0\n"
+    errors = app.mindix_scan_all_errors(code, "ordre.py")
+    assert [e["line"] for e in errors] == [3, 4, 5]
+
+
+def test_rules_are_not_timed_unless_enabled(monkeypatch):
+    monkeypatch.setattr(app, "MINDIX_RULE_STATS_ENABLED", False)
+    before = app.MINDIX_RULE_STATS["rule_zero_division"]["calls"]
+    assert len(app.mindix_scan_all_errors("a = 1/0\n", "off.py")) == 1
+    assert app.MINDIX_RULE_STATS["rule_zero_division"]["calls"] == before
+
+
+def test_rule_stats_from_pool_workers_reach_the_web_process(monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "MINDIX_RULE_STATS_ENABLED", True)
+    monkeypatch.setattr(app, "MINDIX_SCAN_WORKERS", 2)
+    monkeypatch.setattr(app, "scan_cache", app.ScanResultCache(str(tmp_path), 100, 10 * 1024 * 1024))
+    files = [(f"w{i}.py", f"x = {i}/0\ny = {i} % 0\n") for i in range(6)]
+    before = app.pop_rule_stats()
+    try:
+        app.mindix_scan_many(files)
+        stats = app.app.test_client().get("/mindix/rules/stats").get_json()
+    finally:
+        app.reset_scan_pool(kill=True)
+        app.add_rule_stats(before)
+    assert stats["rule_zero_division"]["findings"] == 12
+    assert stats["rule_zero_division"]["calls"] == 12
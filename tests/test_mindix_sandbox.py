@@ -0,0 +1,55 @@
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+
+
+@pytest.fixture
+def one_slot(monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "MINDIX_MAX_TOOLS", 1)
+    monkeypatch.setattr(app, "MINDIX_TOOL_SLOTS_DIR", str(tmp_path))
+    monkeypatch.setattr(app, "_TOOL_STATS_FILE", str(tmp_path / "counters.bin"))
+
+
+def wait_for_slot(seconds):
+    try:
+        with app.tool_slot(timeout=seconds):
+            pass
+    except app.ToolRejected:
+        pass
+
+
+def wait_until(predicate, seconds=10):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_waiter_killed_without_cleanup_leaves_the_queue(one_slot):
+    with app.tool_slot():
+        waiter = multiprocessing.get_context("fork").Process(target=wait_for_slot, args=(30,))
+        waiter.start()
+        assert wait_until(lambda: app.count_waiting_tools() == 1)
+        os.kill(waiter.pid, signal.SIGKILL)  # comme os._exit dans un worker du pool : aucun finally
+        waiter.join()
+        assert app.count_waiting_tools() == 0
+        assert app.sandbox_stats()["waiting"] == 0
+
+
+def test_rejected_waiter_leaves_the_queue(one_slot):
+    with app.tool_slot():
+        wait_for_slot(0.1)
+        stats = app.sandbox_stats()
+    assert stats["waiting"] == 0
+    assert stats["rejected"] == 1
+    assert stats["active"] == 1
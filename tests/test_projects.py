@@ -0,0 +1,62 @@
+import io
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    admin_file = tmp_path / "admins.json"
+    admin_file.write_text(json.dumps(["127.0.0.1"]))
+    project_file = str(tmp_path / "projects.json")
+    monkeypatch.setattr(app, "ADMIN_FILE", str(admin_file))
+    monkeypatch.setattr(app, "PROJECT_FILE", project_file)
+    monkeypatch.setitem(app.PROJECT_CATALOGS, "projects", (project_file,) + app.PROJECT_CATALOGS["projects"][1:])
+    return app.app.test_client()
+
+
+def test_import_rejects_long_line_without_reading_it_whole():
+    body = io.BytesIO(b'{"name": "a", "link": "https://a"}\n' + b"x" * (10 * app.IMPORT_MAX_LINE_BYTES) + b"\n{}\n")
+    reads = []
+    original = body.readline
+    body.readline = lambda size=-1: reads.append(size) or original(size)
+
+    lines = list(app.iter_import_lines(body))
+
+    assert lines[0].startswith(b'{"name"') and lines[1] is None and lines[2] == b"{}\n"
+    assert all(0 < size <= app.IMPORT_MAX_LINE_BYTES + 1 for size in reads)
+
+
+def test_import_reports_long_line(client):
+    body = b'{"name": "a", "link": "https://a"}\n' + b"x" * (app.IMPORT_MAX_LINE_BYTES + 10) + b"\n"
+    report = client.post("/projects/import?skip_invalid=1", data=body).get_json()
+    assert report["errors"] == [{"line": 2, "error": f"ligne trop longue (> {app.IMPORT_MAX_LINE_BYTES} octets)"}]
+    assert report["created"] == 1
+
+
+def test_concurrent_add_and_import_keep_every_project(client):
+    names = [f"p{i}" for i in range(20)]
+    body = "".join(json.dumps({"name": f"imported{i}", "link": f"https://i/{i}"}) + "\n" for i in range(20))
+
+    def add(name):
+        client.post("/add_project", json={"name": name, "link": f"https://x/{name}"})
+
+    def import_all():
+        for _ in range(5):
+            client.post("/projects/import", data=body)
+    threads = [threading.Thread(target=add, args=(name,)) for name in names] + [threading.Thread(target=import_all)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    projects = app.load_projects()
+    assert set(names) <= set(projects)
+    assert len(projects) == 40
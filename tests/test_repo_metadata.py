@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+
+REPO = "nova/life"
+
+
+class FlakyFetcher(app.FakeMetadataFetcher):
+    def __init__(self, delay=0.0):
+        super().__init__(delay)
+        self.fail = False
+
+    def fetch(self, repo):
+        if self.fail:
+            self.calls.append(repo)
+            raise RuntimeError("API GitHub indisponible")
+        return super().fetch(repo)
+
+
+@pytest.fixture
+def fetcher():
+    return FlakyFetcher()
+
+
+@pytest.fixture
+def cache(fetcher):
+    return app.RepoMetadataCache(fetcher, ttl=60)
+
+
+def settle(cache, seconds=5):
+    deadline = time.monotonic() + seconds
+    while cache._pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not cache._pending
+
+
+def age(cache, seconds):
+    cache._entries[REPO]["fetched_at"] -= seconds
+
+
+def test_fresh_entry_is_served_without_refetching(cache, fetcher):
+    assert cache.get(REPO) is None  # premier accès : rien en cache, chargement en fond
+    settle(cache)
+
+    first = cache.get(REPO)
+    assert first == dict(app.FakeMetadataFetcher().fetch(REPO), stale=False)
+    assert cache.get(REPO) == first
+    assert fetcher.calls == [REPO]
+
+
+def test_stale_entry_is_served_then_refreshed_once(cache, fetcher):
+    cache.get(REPO)
+    settle(cache)
+    age(cache, 61)
+    fetcher.delay = 0.3
+
+    start = time.monotonic()
+    served = [cache.get(REPO) for _ in range(3)]
+    assert time.monotonic() - start < 0.2  # get() n'attend jamais le fetch
+    assert all(meta["stale"] for meta in served)
+
+    settle(cache)
+    assert cache.get(REPO)["stale"] is False
+    assert fetcher.calls == [REPO, REPO]  # un seul rafraîchissement pour les trois get()
+
+
+def test_failed_fetch_backs_off_and_keeps_last_value(cache, fetcher, monkeypatch):
+    cache.get(REPO)
+    settle(cache)
+    age(cache, 61)
+    fetcher.fail = True
+
+    assert cache.get(REPO)["stale"] is True
+    settle(cache)
+    assert cache._entries[REPO]["error"] == "API GitHub indisponible"
+
+    # en attente de retry_at : la dernière valeur reste servie, sans nouvel appel
+    assert cache.get(REPO)["stars"] == app.FakeMetadataFetcher().fetch(REPO)["stars"]
+    settle(cache)
+    assert len(fetcher.calls) == 2
+
+    fetcher.fail = False
+    monkeypatch.setattr(app.time, "time", lambda real=time.time: real() + app.REPO_META_ERROR_RETRY + 1)
+    cache.get(REPO)
+    settle(cache)
+    assert len(fetcher.calls) == 3
+    assert cache._entries[REPO]["error"] is None
+
+
+def test_first_fetch_failure_returns_none_until_retry(cache, fetcher):
+    fetcher.fail = True
+    assert cache.get(REPO) is None
+    settle(cache)
+    assert cache.get(REPO) is None
+    settle(cache)
+    assert fetcher.calls == [REPO]
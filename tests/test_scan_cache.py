@@ -0,0 +1,77 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+
+ERRORS = [{"line": 1, "title": "➗ Division par zéro", "severity": 2}]
+
+
+def key(name):
+    return app.scan_cache_key(app.content_sha256(name), ".py")
+
+
+def lookups(cache):
+    c = cache.counters
+    return c["memory_hits"], c["disk_hits"], c["misses"]
+
+
+def test_memory_hit_returns_a_copy(tmp_path):
+    cache = app.ScanResultCache(str(tmp_path), 10, 1024 * 1024)
+    cache.put(key("a"), ERRORS)
+
+    first = cache.get(key("a"))
+    first[0]["line"] = 99
+    assert cache.get(key("a")) == ERRORS
+    assert lookups(cache) == (2, 0, 0)
+
+
+def test_disk_tier_serves_entries_evicted_from_memory(tmp_path):
+    cache = app.ScanResultCache(str(tmp_path), 1, 1024 * 1024)
+    cache.put(key("a"), ERRORS)
+    cache.put(key("b"), [])  # a sort du tier mémoire (1 entrée)
+
+    assert cache.get(key("a")) == ERRORS
+    assert cache.get(key("a")) == ERRORS  # remonté en mémoire par le hit disque
+    assert cache.get(key("c")) is None
+    assert lookups(cache) == (1, 1, 1)
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    app.ScanResultCache(str(tmp_path), 10, 1024 * 1024).put(key("a"), ERRORS)
+    cache = app.ScanResultCache(str(tmp_path), 10, 1024 * 1024)
+    assert cache.get(key("a")) == ERRORS
+    assert lookups(cache) == (0, 1, 0)
+
+
+def test_peek_and_contains_do_not_count(tmp_path):
+    cache = app.ScanResultCache(str(tmp_path), 10, 1024 * 1024)
+    cache.put(key("a"), ERRORS)
+    assert cache.peek(key("a")) == ERRORS
+    assert cache.peek(key("b")) is None
+    assert cache.contains(key("a")) and not cache.contains(key("b"))
+    assert lookups(cache) == (0, 0, 0)
+    assert cache.stats()["hit_rate"] == 0.0
+
+
+def test_transient_results_are_not_stored(tmp_path):
+    cache = app.ScanResultCache(str(tmp_path), 10, 1024 * 1024)
+    cache.put(key("a"), app.scan_timeout_error("a.py"))
+    assert cache.get(key("a")) is None
+    assert cache.counters["stores"] == 0
+
+
+def test_disk_eviction_drops_least_recently_used(tmp_path):
+    size = len(app.json.dumps(ERRORS, ensure_ascii=False).encode("utf-8"))
+    cache = app.ScanResultCache(str(tmp_path), 1, 3 * size)
+    for i, name in enumerate(("a", "b", "c")):
+        cache.put(key(name), ERRORS)
+        os.utime(cache._path(key(name)), (1000 + i, 1000 + i))
+    cache.get(key("a"))  # hit disque : a redevient le plus récent
+
+    cache.put(key("d"), ERRORS)  # 4 entrées > plafond : retour sous 90 %, b et c partent
+
+    assert cache.counters["disk_evictions"] == 2
+    assert [cache.contains(key(name)) for name in "abcd"] == [True, False, False, True]
+    assert cache.stats()["disk_bytes"] == 2 * size